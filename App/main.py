@@ -1,31 +1,50 @@
+import importlib
+
 from kivymd.app import MDApp
 from kivy.lang import Builder
 from kivy.uix.screenmanager import ScreenManager
 
-# Import all screens except Onboarding, which is in pure Python
+# Only the first screen is imported up front. The others (and what they pull in, e.g.
+# scikit-learn for Insights and matplotlib for its charts) are imported when first shown.
 from Screens.LoginScreen import LoginScreen
-from Screens.SignupScreen import SignupScreen
-from Screens.PhoneScreen import PhoneScreen
-from Screens.PCScreen import PCScreen
-from Screens.InsightsScreen import InsightsScreen
-from Screens.ForecastScreen import ForecastScreen
-from Screens.SettingsScreen import SettingsScreen
-from Screens.OnboardingScreen import OnboardingScreen
+
+
+class LazyScreenManager(ScreenManager):
+    """
+    A ScreenManager that imports and builds a registered screen the first time it is
+    requested (by setting `current` or calling get_screen()).
+    has_screen() and `screens` only report the screens that have been built so far.
+    """
+
+    def __init__(self, **kwargs):
+        super(LazyScreenManager, self).__init__(**kwargs)
+        self._factories = {}
+
+    def register(self, name, module_name, class_name):
+        self._factories[name] = (module_name, class_name)
+
+    def get_screen(self, name):
+        if name in self._factories and not self.has_screen(name):
+            module_name, class_name = self._factories.pop(name)
+            screen_class = getattr(importlib.import_module(module_name), class_name)
+            self.add_widget(screen_class(name=name))
+        return super(LazyScreenManager, self).get_screen(name)
+
 
 class MainApp(MDApp):
     def build(self):
         # Load the single .kv file
         Builder.load_file("all_screens.kv")
 
-        sm = ScreenManager()
+        sm = LazyScreenManager()
         sm.add_widget(LoginScreen(name='login'))
-        sm.add_widget(SignupScreen(name='signup'))
-        sm.add_widget(PhoneScreen(name='phone'))
-        sm.add_widget(PCScreen(name='pc'))
-        sm.add_widget(InsightsScreen(name='insights'))
-        sm.add_widget(ForecastScreen(name='forecast'))
-        sm.add_widget(SettingsScreen(name='settings'))
-        sm.add_widget(OnboardingScreen(name='onboarding'))
+        sm.register('signup', 'Screens.SignupScreen', 'SignupScreen')
+        sm.register('phone', 'Screens.PhoneScreen', 'PhoneScreen')
+        sm.register('pc', 'Screens.PCScreen', 'PCScreen')
+        sm.register('insights', 'Screens.InsightsScreen', 'InsightsScreen')
+        sm.register('forecast', 'Screens.ForecastScreen', 'ForecastScreen')
+        sm.register('settings', 'Screens.SettingsScreen', 'SettingsScreen')
+        sm.register('onboarding', 'Screens.OnboardingScreen', 'OnboardingScreen')
 
         sm.current = "login"
         return sm
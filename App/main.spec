@@ -6,7 +6,16 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=[],
+    hiddenimports=[
+        # Screens are imported by name when first shown (see LazyScreenManager in main.py).
+        'Screens.SignupScreen',
+        'Screens.PhoneScreen',
+        'Screens.PCScreen',
+        'Screens.InsightsScreen',
+        'Screens.ForecastScreen',
+        'Screens.SettingsScreen',
+        'Screens.OnboardingScreen',
+    ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -0,0 +1,148 @@
+import numpy as np
+
+from Backend.MonthIndex import index_to_ym, ym_to_index
+from Backend.SpendMatrix import INCOME_CATEGORY
+
+# Number of months projected after the last month with data.
+FORECAST_HORIZON = 3
+# Weight of the newest month in simple exponential smoothing (0..1).
+SMOOTHING_ALPHA = 0.5
+# Season length in months; with at least two full seasons of history the seasonal naive
+# forecast (same month last year) is used instead of exponential smoothing.
+SEASON_LENGTH = 12
+
+
+def series_matrix(month_dict):
+    """
+    Turn {"YYYY-MM": {category: amount}} into (first_month, categories, matrix), where
+    matrix[i, t] is the amount of categories[i] in month first_month + t (months since
+    1970-01) and months without data are 0.
+    """
+    if hasattr(month_dict, "dense"):
+        # A SpendMatrix already is this matrix.
+        return month_dict.dense()
+    months = [ym_to_index(ym) for ym in month_dict]
+    if not months:
+        return 0, [], np.zeros((0, 0))
+    first = min(months)
+    length = max(months) - first + 1
+    categories = sorted({cat for cat_dict in month_dict.values() for cat in cat_dict})
+    rows = {cat: i for i, cat in enumerate(categories)}
+    matrix = np.zeros((len(categories), length))
+    for ym, cat_dict in month_dict.items():
+        t = ym_to_index(ym) - first
+        for cat, amount in cat_dict.items():
+            matrix[rows[cat], t] = amount
+    return first, categories, matrix
+
+
+def is_income(cat, series):
+    """Income rows: the income category, or a category that never had positive spending."""
+    return cat.lower() == INCOME_CATEGORY or not (series > 0).any()
+
+
+def exponential_smoothing(matrix, horizon, alpha=SMOOTHING_ALPHA):
+    """Simple exponential smoothing of every row at once; the forecast is the last level."""
+    level = matrix[:, 0].copy()
+    for t in range(1, matrix.shape[1]):
+        level = alpha * matrix[:, t] + (1 - alpha) * level
+    return np.repeat(level[:, None], horizon, axis=1)
+
+
+def seasonal_naive(matrix, horizon, season=SEASON_LENGTH):
+    """Each projected month repeats the same month one season earlier, for every row at once."""
+    length = matrix.shape[1]
+    return matrix[:, length - season + np.arange(horizon) % season]
+
+
+def fit_forecasts(matrix, horizon, alpha=SMOOTHING_ALPHA, season=SEASON_LENGTH):
+    """Forecast every row of matrix in one batched pass. Returns (forecasts, method name)."""
+    if matrix.shape[1] >= 2 * season:
+        return seasonal_naive(matrix, horizon, season), "seasonal naive"
+    return exponential_smoothing(matrix, horizon, alpha), "exponential smoothing"
+
+
+class SpendingForecaster:
+    """
+    Projects a user's monthly spending per category (SpentML.user_spending, or the global
+    monthly_spend when nobody is logged in) FORECAST_HORIZON months ahead.
+
+    Results are cached per user and engine.data_version, so asking again without new data
+    is free. When the data did change, only the categories whose monthly series differs
+    from the last fit are refitted (together, in one batch); the others keep their
+    forecasts. A new month changes every series' length, so it refits all of them.
+
+    Categories that are zero in every month (e.g. after a correction moved all of them
+    elsewhere) are left out. Income rows (see is_income) are forecast too, but reported
+    apart from spending, so they never reduce the projected spending totals.
+    """
+
+    def __init__(self, horizon=FORECAST_HORIZON, alpha=SMOOTHING_ALPHA, season=SEASON_LENGTH):
+        self.horizon = horizon
+        self.alpha = alpha
+        self.season = season
+        self._results = {}  # user -> (data_version, result)
+        self._fits = {}     # user -> last fit: first month, length, series and forecast per category
+
+    def forecast(self, engine):
+        """
+        Return {"months": [...], "method": str, "forecasts": {category: [amount per month]},
+        "income": {category: [amount per month]}, "refitted": number of categories fitted
+        for this call}. Income amounts keep their sign (negative).
+        """
+        user = engine.username
+        cached = self._results.get(user)
+        if cached is not None and cached[0] == engine.data_version:
+            return cached[1]
+
+        month_dict = engine.user_spending[user] if user else engine.monthly_spend
+        first, categories, matrix = series_matrix(month_dict)
+        active = (matrix != 0).any(axis=1)
+        categories = [cat for cat, keep in zip(categories, active.tolist()) if keep]
+        matrix = matrix[active]
+        length = matrix.shape[1]
+
+        previous = self._fits.get(user)
+        same_range = previous is not None and previous["first"] == first and previous["length"] == length
+        forecasts = {}
+        changed = []
+        for i, cat in enumerate(categories):
+            if same_range and cat in previous["series"] and np.array_equal(previous["series"][cat], matrix[i]):
+                forecasts[cat] = previous["forecasts"][cat]
+            else:
+                changed.append(i)
+        if changed:
+            values, method = fit_forecasts(matrix[changed], self.horizon, self.alpha, self.season)
+            for row, i in enumerate(changed):
+                forecasts[categories[i]] = values[row]
+        else:
+            method = previous["method"] if previous is not None else "exponential smoothing"
+
+        self._fits[user] = {
+            "first": first,
+            "length": length,
+            "method": method,
+            "series": {cat: matrix[i] for i, cat in enumerate(categories)},
+            "forecasts": forecasts,
+        }
+        income_rows = {cat for i, cat in enumerate(categories) if is_income(cat, matrix[i])}
+        result = {
+            "months": [index_to_ym(first + length + h) for h in range(self.horizon)] if categories else [],
+            "method": method,
+            "forecasts": {cat: values.tolist() for cat, values in forecasts.items() if cat not in income_rows},
+            "income": {cat: values.tolist() for cat, values in forecasts.items() if cat in income_rows},
+            "refitted": len(changed),
+        }
+        self._results[user] = (engine.data_version, result)
+        return result
+
+
+_forecaster = None
+
+
+def forecast_spending(engine):
+    """Forecast the engine's current user with the shared (caching) SpendingForecaster."""
+    global _forecaster
+    if _forecaster is None:
+        _forecaster = SpendingForecaster()
+    return _forecaster.forecast(engine)
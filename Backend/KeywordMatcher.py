@@ -0,0 +1,100 @@
+from collections import deque
+
+
+class KeywordMap(dict):
+    """
+    A dict of keyword -> category that counts its changes in `version`, so a matcher
+    compiled from it knows when it has to be rebuilt.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.version += 1
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.version += 1
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.version += 1
+
+    def setdefault(self, key, default=None):
+        self.version += 1
+        return super().setdefault(key, default)
+
+    def pop(self, *args):
+        self.version += 1
+        return super().pop(*args)
+
+    def popitem(self):
+        self.version += 1
+        return super().popitem()
+
+    def clear(self):
+        super().clear()
+        self.version += 1
+
+
+class KeywordMatcher:
+    """
+    An Aho-Corasick automaton over a list of keywords.
+
+    first_match() scans a text once, whatever the number of keywords, and returns the
+    matching keyword with the lowest rank (its position in the list), which is the one a
+    loop over the list testing `keyword in text` would have found first. Overlapping and
+    nested matches are therefore resolved by list order alone, not by position or length.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self._goto = [{}]      # state -> {char: next state}
+        self._fail = [0]       # state -> longest proper suffix state
+        no_match = len(self.keywords)
+        self._best = [no_match]  # state -> lowest keyword rank ending here (incl. via fail links)
+
+        for rank, keyword in enumerate(self.keywords):
+            state = 0
+            for ch in keyword:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._best.append(no_match)
+                state = nxt
+            self._best[state] = min(self._best[state], rank)
+
+        # Breadth-first, so fail targets (shorter) are finished before the states using them.
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = fail
+                self._best[nxt] = min(self._best[nxt], self._best[fail])
+                queue.append(nxt)
+
+    def first_match(self, text):
+        """Return the lowest-ranked keyword contained in text, or None."""
+        goto, fail_links, best_at = self._goto, self._fail, self._best
+        # An empty keyword matches everything (it is the root state's own output).
+        best = best_at[0]
+        state = 0
+        for ch in text:
+            if best == 0:
+                break
+            while state and ch not in goto[state]:
+                state = fail_links[state]
+            state = goto[state].get(ch, 0)
+            if best_at[state] < best:
+                best = best_at[state]
+        return self.keywords[best] if best < len(self.keywords) else None
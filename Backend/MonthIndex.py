@@ -0,0 +1,58 @@
+"""
+Integer month keys: the number of months since January 1970.
+
+"YYYY-MM" strings stay the public format everywhere; integers are used where months are
+stored in arrays, sorted or compared, since consecutive months are consecutive integers.
+"""
+import datetime
+
+import numpy as np
+
+EPOCH_YEAR = 1970
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def ym_to_index(date_ym):
+    """Convert "YYYY-MM" to months since 1970-01 ("2024-03" -> 650)."""
+    return (int(date_ym[:4]) - EPOCH_YEAR) * 12 + int(date_ym[5:7]) - 1
+
+
+def index_to_ym(index):
+    """Convert months since 1970-01 back to "YYYY-MM" (650 -> "2024-03")."""
+    year, month = divmod(int(index), 12)
+    return f"{year + EPOCH_YEAR:04d}-{month + 1:02d}"
+
+
+def _days_in_month(year, month):
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return 29
+    return _DAYS_IN_MONTH[month - 1]
+
+
+def iso_date_to_index(date_str):
+    """
+    Month index of a "YYYY-MM-DD" date. Well-formed ISO dates are sliced directly; anything
+    else goes through strptime, so invalid dates raise ValueError exactly as before.
+    """
+    if len(date_str) == 10 and date_str[4] == "-" and date_str[7] == "-" \
+            and date_str[:4].isdigit() and date_str[5:7].isdigit() and date_str[8:].isdigit():
+        year, month, day = int(date_str[:4]), int(date_str[5:7]), int(date_str[8:])
+        if year >= 1 and 1 <= month <= 12 and 1 <= day <= _days_in_month(year, month):
+            return (year - EPOCH_YEAR) * 12 + month - 1
+    date_obj = datetime.datetime.strptime(date_str, "%Y-%m-%d")
+    return (date_obj.year - EPOCH_YEAR) * 12 + date_obj.month - 1
+
+
+def iso_dates_to_indexes(date_strs):
+    """
+    Month indexes (int64 array) of a whole column of "YYYY-MM-DD" dates, parsed at once by
+    NumPy's datetime64 (whose month unit counts from 1970-01 too). If the column holds
+    other shapes, it is parsed date by date with iso_date_to_index instead.
+    """
+    dates = np.asarray(date_strs, dtype=str)
+    if dates.size and (np.char.str_len(dates) == 10).all():
+        try:
+            return dates.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        except ValueError:
+            pass
+    return np.array([iso_date_to_index(d) for d in dates.tolist()], dtype=np.int64)
@@ -0,0 +1,310 @@
+from collections.abc import MutableMapping
+
+import numpy as np
+
+from Backend.MonthIndex import index_to_ym, ym_to_index
+from Backend.TransactionStore import Codes
+
+# Rows (categories) and columns (months) allocated up front; both double when they fill up.
+INITIAL_CATEGORIES = 16
+INITIAL_MONTHS = 24
+# Onboarding adjustments book recurring income under this category (as negative amounts).
+INCOME_CATEGORY = "income"
+
+
+class SpendMatrix(MutableMapping):
+    """
+    Monthly spending per category as a dense category x month NumPy matrix.
+
+    Rows are categories (dictionary-encoded in order of first use), columns are consecutive
+    months starting at `first` (months since 1970-01, see Backend/MonthIndex.py); the matrix
+    grows in both directions as new categories and months show up. A boolean matrix
+    records which (category, month) cells were ever written, so a month reports exactly
+    the categories it had, zero amounts included.
+
+    It is the one aggregation engine behind SpentML (global and per-user spending) and
+    SpendingInsights: add()/add_many() update cells, month reports and comparisons are
+    column slices, and the running spending total of every month is kept alongside. Like
+    the Insights charts, that total only counts positive amounts outside the income
+    category, so recurring income and refunds never show up as negative spending.
+
+    It also reads like the {"YYYY-MM": {category: amount}} defaultdicts it replaces:
+    matrix["2024-03"] is a MonthColumn mapping category -> amount (0.0 for a missing
+    category, as with defaultdict(float)), assignment replaces a month, and iteration,
+    len(), get() and items() only see months that have data.
+    """
+
+    def __init__(self, month_dict=None):
+        self.categories = Codes()
+        self.first = 0          # month index of column 0
+        self.n_months = 0       # columns in use
+        self.values = np.zeros((INITIAL_CATEGORIES, INITIAL_MONTHS))
+        self.present = np.zeros((INITIAL_CATEGORIES, INITIAL_MONTHS), dtype=bool)
+        self.totals = np.zeros(INITIAL_MONTHS)
+        self.income_rows = np.zeros(INITIAL_CATEGORIES, dtype=bool)
+        # Sorted differences of a month against the previous one, dropped when either changes.
+        self._sorted = {}
+        for date_ym, cat_dict in (month_dict or {}).items():
+            self[date_ym] = cat_dict
+
+    # -------------------------
+    # Growth
+    # -------------------------
+    def _row(self, cat):
+        row = self.categories.encode(cat)
+        if row >= self.values.shape[0]:
+            self._resize(rows=2 * self.values.shape[0])
+        if cat.lower() == INCOME_CATEGORY:
+            self.income_rows[row] = True
+        return row
+
+    def _spent(self, rows, values):
+        """What cells holding `values` in `rows` add to their month's spending total."""
+        return np.where(~self.income_rows[rows] & (values > 0), values, 0.0)
+
+    def _col(self, month):
+        """Column of a month index, widening the covered month range if needed."""
+        if self.n_months == 0:
+            self.first = month
+            self.n_months = 1
+            return 0
+        if month < self.first:
+            shift = self.first - month
+            self._resize(cols=max(2 * self.values.shape[1], self.n_months + shift), shift=shift)
+            self.first = month
+            self.n_months += shift
+            return 0
+        col = month - self.first
+        if col >= self.n_months:
+            if col >= self.values.shape[1]:
+                self._resize(cols=max(2 * self.values.shape[1], col + 1))
+            self.n_months = col + 1
+        return col
+
+    def _resize(self, rows=None, cols=None, shift=0):
+        rows = rows or self.values.shape[0]
+        cols = cols or self.values.shape[1]
+        n_rows = min(len(self.categories), self.values.shape[0])
+        used = slice(shift, shift + self.n_months)
+        values = np.zeros((rows, cols))
+        present = np.zeros((rows, cols), dtype=bool)
+        totals = np.zeros(cols)
+        values[:n_rows, used] = self.values[:n_rows, :self.n_months]
+        present[:n_rows, used] = self.present[:n_rows, :self.n_months]
+        totals[used] = self.totals[:self.n_months]
+        income_rows = np.zeros(rows, dtype=bool)
+        income_rows[:n_rows] = self.income_rows[:n_rows]
+        self.values, self.present, self.totals, self.income_rows = values, present, totals, income_rows
+
+    def _existing_col(self, month):
+        col = month - self.first
+        return col if self.n_months and 0 <= col < self.n_months else None
+
+    def _invalidate(self, month):
+        self._sorted.pop(month, None)
+        self._sorted.pop(month + 1, None)
+
+    # -------------------------
+    # Updates
+    # -------------------------
+    def add(self, date_ym, cat, delta):
+        """Add delta to one (month, category) cell."""
+        self.add_at(ym_to_index(date_ym), cat, delta)
+
+    def add_at(self, month, cat, delta):
+        """add() with the month given as a month index."""
+        row = self._row(cat)
+        col = self._col(month)
+        before = self.values[row, col]
+        self.values[row, col] += delta
+        self.present[row, col] = True
+        self.totals[col] += self._spent(row, self.values[row, col]) - self._spent(row, before)
+        self._invalidate(month)
+
+    def add_many(self, months, categories, codes, amounts):
+        """
+        Add a whole batch at once: months (month indexes) and amounts are arrays, codes[i]
+        indexes into the `categories` list. Repeated cells are summed with np.add.at.
+        """
+        months = np.asarray(months, dtype=np.int64)
+        if not len(months):
+            return
+        rows = np.array([self._row(cat) for cat in categories], dtype=np.int64)[np.asarray(codes)]
+        self._col(int(months.min()))
+        self._col(int(months.max()))
+        cols = months - self.first
+        # Spending totals change by what each touched cell adds after the batch minus before.
+        cells = np.unique(rows * self.values.shape[1] + cols)
+        cell_rows, cell_cols = np.divmod(cells, self.values.shape[1])
+        before = self._spent(cell_rows, self.values[cell_rows, cell_cols])
+        np.add.at(self.values, (rows, cols), amounts)
+        np.add.at(self.totals, cell_cols, self._spent(cell_rows, self.values[cell_rows, cell_cols]) - before)
+        self.present[rows, cols] = True
+        for month in np.unique(months).tolist():
+            self._invalidate(month)
+
+    def set(self, date_ym, cat, amount):
+        month = ym_to_index(date_ym)
+        row = self._row(cat)
+        col = self._col(month)
+        self.totals[col] += self._spent(row, amount) - self._spent(row, self.values[row, col])
+        self.values[row, col] = amount
+        self.present[row, col] = True
+        self._invalidate(month)
+
+    # -------------------------
+    # Reports
+    # -------------------------
+    def month(self, date_ym):
+        """{category: amount} for one month (a column slice)."""
+        col = self._existing_col(ym_to_index(date_ym))
+        if col is None:
+            return {}
+        n = len(self.categories)
+        rows = np.nonzero(self.present[:n, col])[0]
+        names = self.categories.values
+        return {names[row]: float(value) for row, value in zip(rows.tolist(), self.values[rows, col].tolist())}
+
+    def differences(self, month1, month2):
+        """
+        [(category, amount in month1, amount in month2, change)] for every category either
+        month has, biggest absolute change first. Adjacent months are cached until one changes.
+        """
+        m1, m2 = ym_to_index(month1), ym_to_index(month2)
+        adjacent = m2 - m1 == 1
+        if adjacent and m2 in self._sorted:
+            return self._sorted[m2]
+        n = len(self.categories)
+        c1, c2 = self._existing_col(m1), self._existing_col(m2)
+        v1 = self.values[:n, c1] if c1 is not None else np.zeros(n)
+        v2 = self.values[:n, c2] if c2 is not None else np.zeros(n)
+        present = np.zeros(n, dtype=bool)
+        if c1 is not None:
+            present |= self.present[:n, c1]
+        if c2 is not None:
+            present |= self.present[:n, c2]
+        rows = np.nonzero(present)[0]
+        change = v2[rows] - v1[rows]
+        order = np.argsort(-np.abs(change), kind="stable")
+        names = self.categories.values
+        diffs = [
+            (names[rows[i]], float(v1[rows[i]]), float(v2[rows[i]]), float(change[i]))
+            for i in order.tolist()
+        ]
+        if adjacent:
+            self._sorted[m2] = diffs
+        return diffs
+
+    def trend(self, start_ym, end_ym):
+        """[("YYYY-MM", total spent)] for every month from start_ym to end_ym (inclusive)."""
+        start, end = ym_to_index(start_ym), ym_to_index(end_ym)
+        result = []
+        for month in range(start, end + 1):
+            col = self._existing_col(month)
+            result.append((index_to_ym(month), float(self.totals[col]) if col is not None else 0.0))
+        return result
+
+    def dense(self):
+        """(first month index, category names, category x month matrix copy) of the covered range."""
+        n = len(self.categories)
+        return self.first, list(self.categories.values), self.values[:n, :self.n_months].copy()
+
+    def to_dict(self):
+        return {date_ym: self.month(date_ym) for date_ym in self}
+
+    # -------------------------
+    # Mapping interface ({"YYYY-MM": {category: amount}})
+    # -------------------------
+    def __getitem__(self, date_ym):
+        return MonthColumn(self, date_ym)
+
+    def __setitem__(self, date_ym, cat_dict):
+        cat_dict = dict(cat_dict)
+        if date_ym in self:
+            del self[date_ym]
+        for cat, amount in cat_dict.items():
+            self.set(date_ym, cat, amount)
+
+    def __delitem__(self, date_ym):
+        month = ym_to_index(date_ym)
+        col = self._existing_col(month)
+        if col is None or not self.present[:, col].any():
+            raise KeyError(date_ym)
+        self.values[:, col] = 0.0
+        self.present[:, col] = False
+        self.totals[col] = 0.0
+        self._invalidate(month)
+
+    def __contains__(self, date_ym):
+        try:
+            col = self._existing_col(ym_to_index(date_ym))
+        except (TypeError, ValueError):
+            return False
+        return col is not None and bool(self.present[:, col].any())
+
+    def __iter__(self):
+        cols = np.nonzero(self.present[:, :self.n_months].any(axis=0))[0]
+        return (index_to_ym(self.first + col) for col in cols.tolist())
+
+    def __len__(self):
+        return int(self.present[:, :self.n_months].any(axis=0).sum())
+
+    def get(self, date_ym, default=None):
+        return self[date_ym] if date_ym in self else default
+
+    def clear(self):
+        self.__init__()
+
+
+class MonthColumn(MutableMapping):
+    """One month of a SpendMatrix, as a {category: amount} mapping that writes through."""
+
+    def __init__(self, matrix, date_ym):
+        self.matrix = matrix
+        self.date_ym = date_ym
+
+    def _cell(self, cat):
+        row = self.matrix.categories.get(cat)
+        col = self.matrix._existing_col(ym_to_index(self.date_ym))
+        if row is None or col is None or not self.matrix.present[row, col]:
+            return None
+        return row, col
+
+    def __getitem__(self, cat):
+        # Missing categories read as 0.0, like defaultdict(float) (without inserting them).
+        cell = self._cell(cat)
+        return float(self.matrix.values[cell]) if cell is not None else 0.0
+
+    def __setitem__(self, cat, amount):
+        self.matrix.set(self.date_ym, cat, amount)
+
+    def __delitem__(self, cat):
+        cell = self._cell(cat)
+        if cell is None:
+            raise KeyError(cat)
+        self.matrix.totals[cell[1]] -= self.matrix._spent(cell[0], self.matrix.values[cell])
+        self.matrix.values[cell] = 0.0
+        self.matrix.present[cell] = False
+        self.matrix._invalidate(ym_to_index(self.date_ym))
+
+    def __contains__(self, cat):
+        return self._cell(cat) is not None
+
+    def __iter__(self):
+        return iter(self.matrix.month(self.date_ym))
+
+    def __len__(self):
+        return len(self.matrix.month(self.date_ym))
+
+    def get(self, cat, default=None):
+        cell = self._cell(cat)
+        return float(self.matrix.values[cell]) if cell is not None else default
+
+    def items(self):
+        return self.matrix.month(self.date_ym).items()
+
+    def values(self):
+        return self.matrix.month(self.date_ym).values()
+
+    def __repr__(self):
+        return repr(self.matrix.month(self.date_ym))
@@ -1,5 +1,27 @@
-import datetime
-from collections import defaultdict
+import numpy as np
+
+from Backend.KeywordMatcher import KeywordMap, KeywordMatcher
+from Backend.MonthIndex import iso_date_to_index, iso_dates_to_indexes
+from Backend.SpendMatrix import SpendMatrix
+
+# Keywords -> Category mapping (expand or refine as you like)
+# "shoes" -> "Clothing"
+# "grocery", "supermarket" -> "Groceries"
+# Also the keyword tier of SpentML's categorizer (see Backend/TieredCategorizer.py).
+DEFAULT_KEYWORD_MAP = {
+    'shoes': 'Clothing',
+    'shirt': 'Clothing',
+    'pants': 'Clothing',
+    'grocery': 'Groceries',
+    'supermarket': 'Groceries',
+    'restaurant': 'Dining',
+    'cafe': 'Dining',
+    'electricity': 'Utilities',
+    'water': 'Utilities',
+    'rent': 'Housing',
+    'mortgage': 'Housing',
+    # Add more keywords as needed
+}
 
 
 class SpendingInsights:
@@ -11,40 +33,46 @@ class SpendingInsights:
     """
 
     def __init__(self):
-        # Keywords -> Category mapping (expand or refine as you like)
-        # "shoes" -> "Clothing"
-        # "grocery", "supermarket" -> "Groceries"
-        self.keyword_map = {
-            'shoes': 'Clothing',
-            'shirt': 'Clothing',
-            'pants': 'Clothing',
-            'grocery': 'Groceries',
-            'supermarket': 'Groceries',
-            'restaurant': 'Dining',
-            'cafe': 'Dining',
-            'electricity': 'Utilities',
-            'water': 'Utilities',
-            'rent': 'Housing',
-            'mortgage': 'Housing',
-            # Add more keywords as needed
-        }
+        # Keywords -> Category mapping (a copy, so each instance can refine its own)
+        self.keyword_map = dict(DEFAULT_KEYWORD_MAP)
 
-        # Data structure to track spending:
+        # Data structure to track spending: a category x month matrix (the same aggregation
+        # engine SpentML uses, see Backend/SpendMatrix.py) that also reads as a dict,
         # e.g. self.monthly_spend['2023-03']['Groceries'] = 120.50
-        self.monthly_spend = defaultdict(lambda: defaultdict(float))
+        self.monthly_spend = SpendMatrix()
+
+    @property
+    def keyword_map(self):
+        return self._keyword_map
+
+    @keyword_map.setter
+    def keyword_map(self, mapping):
+        # Kept as a KeywordMap so changes to it (e.g. user_correct_category) are noticed.
+        self._keyword_map = KeywordMap(mapping)
+        self._matcher = None
+
+    def _keyword_matcher(self):
+        """The automaton for the current keywords, recompiled only after keyword_map changed."""
+        version = (id(self._keyword_map), self._keyword_map.version)
+        if self._matcher is None or self._matcher_version != version:
+            self._matcher = KeywordMatcher(self._keyword_map)
+            self._matcher_version = version
+        return self._matcher
 
     def categorize_transaction(self, description: str) -> str:
         """
         A naive approach that looks for known keywords.
         If found, returns the matched category;
         otherwise, returns 'Misc' or something.
+
+        The description is scanned once by a keyword automaton. When several keywords
+        occur, the one added to keyword_map first wins.
         """
 
-        desc_lower = description.lower()
-        for kw, cat in self.keyword_map.items():
-            if kw in desc_lower:
-                return cat
-        return "Misc"
+        keyword = self._keyword_matcher().first_match(description.lower())
+        if keyword is None:
+            return "Misc"
+        return self._keyword_map[keyword]
 
     def add_transaction(self, date_str: str, description: str, amount: float):
         """
@@ -54,12 +82,41 @@ class SpendingInsights:
         4) Add to the aggregator for that month & category.
         """
 
-        # Convert "2023-05-18" to "2023-05"
-        date_obj = datetime.datetime.strptime(date_str, "%Y-%m-%d")
-        year_month = date_obj.strftime("%Y-%m")
+        # "2023-05-18" -> its month index (no strptime/strftime for ISO dates)
+        month = iso_date_to_index(date_str)
 
         category = self.categorize_transaction(description)
-        self.monthly_spend[year_month][category] += amount
+        self.monthly_spend.add_at(month, category, amount)
+
+    def add_transactions(self, date_strs, descriptions, amounts):
+        """
+        Add many transactions given as three columns. The dates are parsed in one go with
+        NumPy datetime64, each distinct description is categorized once, and the amounts are
+        added to the spending matrix in a single scatter-add.
+        """
+        months = iso_dates_to_indexes(date_strs)
+        amounts = np.asarray(amounts, dtype=np.float64)
+        if not len(months):
+            return
+        if len(descriptions) != len(months) or len(amounts) != len(months):
+            raise ValueError("date_strs, descriptions and amounts must have the same length")
+
+        categories = []
+        category_codes = {}
+        desc_codes = {}
+        codes = np.empty(len(months), dtype=np.int64)
+        for i, description in enumerate(descriptions):
+            code = desc_codes.get(description)
+            if code is None:
+                category = self.categorize_transaction(description)
+                code = category_codes.get(category)
+                if code is None:
+                    code = category_codes[category] = len(categories)
+                    categories.append(category)
+                desc_codes[description] = code
+            codes[i] = code
+
+        self.monthly_spend.add_many(months, categories, codes, amounts)
 
     def compare_months(self, month1: str, month2: str):
         """
@@ -69,21 +126,9 @@ class SpendingInsights:
           A dict with { 'increases': [...], 'decreases': [...], 'summary': 'some summary' }
           or just a string summary, your call.
         """
-        cat_spend1 = self.monthly_spend[month1]
-        cat_spend2 = self.monthly_spend[month2]
-
-        # Gather all categories from both months
-        all_cats = set(cat_spend1.keys()) | set(cat_spend2.keys())
-
-        diffs = []
-        for cat in all_cats:
-            val1 = cat_spend1.get(cat, 0.0)
-            val2 = cat_spend2.get(cat, 0.0)
-            change = val2 - val1  # positive => spent more in month2
-            diffs.append((cat, val1, val2, change))
-
-        # Sort by absolute difference descending
-        diffs.sort(key=lambda x: abs(x[3]), reverse=True)
+        # (category, month1 amount, month2 amount, change) for the categories of both months,
+        # sorted by absolute difference descending; change positive => spent more in month2
+        diffs = self.monthly_spend.differences(month1, month2)
 
         # The category with the biggest absolute difference is diffs[0]
         # Summarize the top difference
@@ -106,8 +151,7 @@ class SpendingInsights:
         Return a dictionary of categories -> amounts for a specific month.
         e.g. { 'Groceries': 150.0, 'Clothing': 20.0, 'Misc': 10.0 }
         """
-        cat_data = self.monthly_spend[year_month]
-        return dict(cat_data)
+        return self.monthly_spend.month(year_month)
 
     # Optional: If user corrects the category, we can update the "keyword_map"
     # or store it for an ML approach in the future.
@@ -0,0 +1,91 @@
+import json
+import os
+
+
+class SpentJournal:
+    """
+    An append-only, line-delimited JSON journal of SpentML mutations.
+
+    Every mutation (a new transaction, a month adjustment, a correction, a new
+    training sample) is written as one JSON object on its own line, so recording
+    a change only costs a single append instead of rewriting the whole data file.
+
+    Each record carries a monotonically increasing "seq" number. The snapshot
+    stores the seq of the last record folded into it, which lets load_data()
+    skip records that were already compacted even if the process died between
+    writing the snapshot and truncating the journal.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.seq = 0        # seq of the last record written or read
+        self.pending = 0    # records appended since the last compaction
+
+    def append(self, record):
+        """Append a single record and return its seq number."""
+        return self.append_many([record])
+
+    def append_many(self, records):
+        """Append several records with one open/write/flush."""
+        lines = []
+        for record in records:
+            self.seq += 1
+            record["seq"] = self.seq
+            lines.append(json.dumps(record))
+        if not lines:
+            return self.seq
+        with open(self.path, "a") as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+        self.pending += len(lines)
+        return self.seq
+
+    def replay(self, after_seq=0):
+        """
+        Yield the records with a seq greater than after_seq, in order.
+
+        A torn last line (e.g. the app was killed mid-write) is ignored and cut off the
+        file, so the next append starts on a fresh line instead of gluing onto it. An
+        unreadable line followed by good records is only skipped: nothing after it is lost.
+        """
+        self.seq = after_seq
+        self.pending = 0
+        if not os.path.exists(self.path):
+            return
+        records = []
+        offset = 0          # bytes read so far
+        good_end = 0        # byte offset just past the last complete record
+        torn = False        # an unreadable line follows the last complete record
+        line = b""
+        with open(self.path, "rb") as f:
+            for line in f:
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    torn = True
+                    continue
+                good_end = offset
+                torn = False
+        if torn:
+            with open(self.path, "r+b") as f:
+                f.truncate(good_end)
+        elif line and not line.endswith(b"\n"):
+            # The last record was written but its newline was not.
+            with open(self.path, "ab") as f:
+                f.write(b"\n")
+        for record in records:
+            seq = record.get("seq", 0)
+            if seq <= after_seq:
+                continue
+            self.seq = seq
+            self.pending += 1
+            yield record
+
+    def truncate(self):
+        """Drop every journal record (called once they are part of a snapshot)."""
+        with open(self.path, "w"):
+            pass
+        self.pending = 0
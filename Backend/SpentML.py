@@ -1,19 +1,36 @@
+import hashlib
 import json
 import os
-from collections import defaultdict
+import threading
+import zipfile
+from collections import OrderedDict, defaultdict, deque
 
-from sklearn.feature_extraction.text import CountVectorizer
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
 from sklearn.naive_bayes import MultinomialNB
 
-ML_DATA_FILE = "spent_ml_data.json"
+from Backend.MonthIndex import ym_to_index
+from Backend.SpendMatrix import SpendMatrix
+from Backend.SpentStorage import make_storage
+from Backend.TieredCategorizer import EXACT_CONFIDENCE, TieredCategorizer
+from Backend.TransactionStore import TransactionStore
+from utils.AccountManager import load_users
 
-
-def load_users():
-    USERS_FILE = "users.json"
-    if not os.path.exists(USERS_FILE):
-        return {}
-    with open(USERS_FILE, "r") as f:
-        return json.load(f)
+# Storage backend used when none is passed in: "json" (snapshot + journal) or "sqlite".
+ML_STORAGE_BACKEND = "json"
+# Size of the fixed (hashed) feature space shared by every fit, so the model can be
+# updated one sample at a time without re-fitting a vocabulary.
+HASH_FEATURES = 2 ** 14
+# Seconds between background full refits; None disables them (incremental updates only).
+REFIT_INTERVAL = None
+# Maximum number of normalized descriptions kept in the prediction cache.
+PREDICTION_CACHE_SIZE = 4096
+# Bumped when the layout of the saved model artifact changes (older artifacts are ignored).
+MODEL_FORMAT_VERSION = 1
+# Categorizations with a lower confidence are queued in review_queue for the user to check.
+CONFIDENCE_THRESHOLD = 0.6
+# Maximum number of transactions waiting for review (the oldest are dropped first).
+REVIEW_QUEUE_SIZE = 500
 
 
 class SpentML:
@@ -22,7 +39,8 @@ class SpentML:
 
     Global training data (training_samples) is used for categorization,
     while spending data is stored globally (monthly_spend) and per user (user_spending).
-    Every transaction is recorded individually in self.transactions for future corrections.
+    Every transaction is recorded individually in self.transactions (a columnar
+    TransactionStore) for future corrections.
 
     Additionally, when a username is provided, the class applies onboarding adjustments
     (recurring income and recurring expenses) from the users.json file. For recurring income:
@@ -32,74 +50,409 @@ class SpentML:
       - "monthly" bills are added once,
       - "weekly" bills are multiplied by 4.
     Adjustments are only applied once per month.
+
+    Persistence goes through a pluggable storage backend (see Backend/SpentStorage.py):
+    every mutation is handed to storage.record() as one record, and load_data()/save_data()
+    delegate to storage.load()/storage.save(). JSONStorage (a global snapshot + journal plus
+    one shard per user) is the default; like SQLiteStorage it only loads the logged-in user's
+    rows, so user_spending and self.transactions hold that user's (and anonymous) data.
+
+    The classifier works on a fixed hashed feature space, so a correction is learned with
+    MultinomialNB.partial_fit on that one description (new categories are appended to the
+    class list on the fly). A full refit over all training samples only happens at
+    construction and, optionally, in a background thread every REFIT_INTERVAL seconds.
+
+    Categorization is tiered (see Backend/TieredCategorizer.py): a description labelled
+    before gets its latest label, and one containing a known keyword gets the keyword's
+    category, with a confidence learned from the user's corrections. Only the rest reaches
+    the classifier, whose predict_proba supplies the confidence.
+    Transactions categorized below CONFIDENCE_THRESHOLD are queued in review_queue until
+    the user corrects them; categorizer_stats() reports the tier hit rates.
+
+    Model predictions are memoized in an LRU cache keyed on the normalized description. Every
+    change to the model bumps model_version, which empties the cache.
+
+    The fitted model (class list plus the Naive Bayes count arrays) is saved next to the data
+    as a NumPy artifact tied to a hash of the training samples it was fitted on. On startup
+    it is loaded instead of refitting; samples added after it was saved are learned
+    incrementally on top.
+
+    The app shares one engine through get_engine(); logging in or out rebinds it to the
+    new user with bind_user() instead of constructing (and reloading) another one.
     """
 
-    def __init__(self, username=None):
+    def __init__(self, username=None, storage=None):
         self.username = username
 
         self.training_samples = []  # list of [desc, category]
-        # Global aggregated spending by month.
-        self.monthly_spend = defaultdict(lambda: defaultdict(float))
-        # User-specific spending: {username: { "YYYY-MM": { "Category": amount, ... } } }
-        self.user_spending = defaultdict(lambda: defaultdict(lambda: defaultdict(float)))
-        # Individual transactions.
-        self.transactions = []
-
-        self.vectorizer = CountVectorizer()
+        # Global aggregated spending by month, as a category x month matrix that also reads as
+        # { "YYYY-MM": { "Category": amount, ... } } (see Backend/SpendMatrix.py).
+        self.monthly_spend = SpendMatrix()
+        # User-specific spending: {username: SpendMatrix}
+        self.user_spending = defaultdict(SpendMatrix)
+        # Individual transactions, stored column-wise (see Backend/TransactionStore.py).
+        self.transactions = TransactionStore()
+        # (username, "YYYY-MM") pairs whose onboarding adjustments have been applied.
+        self.adjusted_months = set()
+        # Positions in self.transactions by (user, normalized description) and by (user, month),
+        # so corrections and per-month lookups only touch the matching rows.
+        self._desc_index = defaultdict(list)
+        self._month_index = defaultdict(list)
+        # Bumped whenever spending data changes, so derived results (e.g. forecasts) can be cached.
+        self.data_version = 0
+
+        self.vectorizer = self._make_vectorizer()
         self.classifier = MultinomialNB()
         self.is_fitted = False
+        # Guards the classifier while the background refit swaps it.
+        self._model_lock = threading.Lock()
+        # Serializes save_model() between the UI thread (save_data) and the refit timer.
+        self._save_lock = threading.Lock()
+        self._refit_timer = None
+        # While a bulk operation runs, records are collected here and persisted in one go.
+        self._batch = None
+
+        # Bumped whenever the classifier changes; cached predictions are only valid for one version.
+        self.model_version = 0
+        self._prediction_cache = OrderedDict()
+        self._cache_version = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        self.categorizer = TieredCategorizer()
+        # Low-confidence transactions awaiting a correction (in memory, for this session).
+        self.review_queue = deque(maxlen=REVIEW_QUEUE_SIZE)
 
+        self.storage = storage if storage is not None else make_storage(ML_STORAGE_BACKEND)
         self.load_data()
-        if self.training_samples:
+        for desc, cat in self.training_samples:
+            self.categorizer.learn(self._normalize_desc(desc), cat)
+        if self.training_samples and not self.load_model():
             self.train_full()
+            self.save_model()
+        if REFIT_INTERVAL:
+            self.start_background_refit(REFIT_INTERVAL)
 
     def load_data(self):
-        if not os.path.exists(ML_DATA_FILE):
-            return
-        with open(ML_DATA_FILE, "r") as f:
-            data = json.load(f)
-        self.training_samples = data.get("training_samples", [])
-        loaded_global = data.get("monthly_spend", {})
-        for ym, cat_dict in loaded_global.items():
-            self.monthly_spend[ym] = defaultdict(float, cat_dict)
-        loaded_users = data.get("user_spending", {})
-        for user, month_dict in loaded_users.items():
-            for ym, cat_dict in month_dict.items():
-                self.user_spending[user][ym] = defaultdict(float, cat_dict)
-        self.transactions = data.get("transactions", [])
+        self.storage.load(self)
+
+    def bind_user(self, username):
+        """
+        Make the engine act for another user (None when logged out). The shared training
+        data, global aggregates and model stay as they are; the storage backend swaps the
+        previous user's rows for the new user's.
+        """
+        if username != self.username:
+            self.username = username
+            self.storage.bind_user(self, username)
+            self.data_version += 1
+        return self
+
+    def _set_transactions(self, transactions):
+        """Replace the transactions (used by the storage backends) and rebuild their indexes."""
+        self.transactions = TransactionStore(transactions)
+        self._desc_index.clear()
+        self._month_index.clear()
+        for pos, t in enumerate(transactions):
+            self._index_transaction(pos, t)
+
+    def _index_transaction(self, pos, t):
+        user = t.get("user")
+        self._desc_index[(user, self._normalize_desc(t["desc"]))].append(pos)
+        self._month_index[(user, t["date_ym"])].append(pos)
 
     def save_data(self):
-        data = {
-            "training_samples": self.training_samples,
-            "monthly_spend": {ym: dict(cat_dict) for ym, cat_dict in self.monthly_spend.items()},
-            "user_spending": {
-                user: {ym: dict(cat_dict) for ym, cat_dict in month_dict.items()}
-                for user, month_dict in self.user_spending.items()
-            },
-            "transactions": self.transactions
-        }
-        with open(ML_DATA_FILE, "w") as f:
-            json.dump(data, f)
+        self.storage.save(self)
+        self.save_model()
+
+    def _record(self, record):
+        """Persist one mutation through the storage backend (or queue it during a bulk operation)."""
+        if self._batch is not None:
+            self._batch.append(record)
+        else:
+            self.storage.record(self, record)
+
+    def _replay(self, record, update_global=True):
+        """
+        Re-apply a journal record to the in-memory state (no model training here).
+        update_global=False leaves monthly_spend alone, for records whose effect on the
+        global aggregates was journaled separately (see JSONStorage's per-user shards).
+        """
+        op = record.get("op")
+        if op == "add":
+            self._apply_add(record.get("user"), record["date_ym"], record["desc"],
+                            record["amount"], record["category"], update_global)
+        elif op == "adjust":
+            self._apply_adjust(record["user"], record["date_ym"], record["deltas"])
+        elif op == "correct":
+            self._apply_correct(record.get("user"), record["desc"], record["category"], update_global)
+        elif op == "sample":
+            self.training_samples.append([record["desc"], record["category"]])
+        elif op == "spend":
+            for date_ym, cat, delta in record["changes"]:
+                self._add_spend(None, date_ym, cat, delta)
+            self.data_version += 1
+
+    @staticmethod
+    def _make_vectorizer():
+        # norm=None and alternate_sign=False keep raw, non-negative term counts (what
+        # CountVectorizer produced), which is what MultinomialNB expects.
+        return HashingVectorizer(n_features=HASH_FEATURES, alternate_sign=False, norm=None)
+
+    def _fit(self, samples):
+        """Fit a fresh classifier on a list of [desc, category] samples."""
+        classifier = MultinomialNB()
+        X = self.vectorizer.transform([s[0] for s in samples])
+        classifier.fit(X, [s[1] for s in samples])
+        return classifier
 
     def train_full(self):
-        descs = [s[0] for s in self.training_samples]
-        cats = [s[1] for s in self.training_samples]
-        if descs:
-            X = self.vectorizer.fit_transform(descs)
-            self.classifier.fit(X, cats)
-            self.is_fitted = True
+        if self.training_samples:
+            classifier = self._fit(self.training_samples)
+            with self._model_lock:
+                self.classifier = classifier
+                self.is_fitted = True
+                self.model_version += 1
 
     def partial_fit_sample(self, desc, cat):
-        self.training_samples.append([desc, cat])
-        self.train_full()
-        self.save_data()
+        self.categorizer.learn(self._normalize_desc(desc), cat)
+        with self._model_lock:
+            # Appended under the lock, so a background refit either fits on this sample or
+            # learns it afterwards, never both.
+            self.training_samples.append([desc, cat])
+            self._learn(self.classifier, desc, cat)
+            self.is_fitted = True
+            self.model_version += 1
+        self._record({"op": "sample", "desc": desc, "category": cat})
 
-    def predict_category(self, desc):
-        if not self.is_fitted:
-            return "Misc"
+    def _learn(self, classifier, desc, cat):
+        """Update classifier in place with one sample: O(len(desc)), independent of history size."""
         X = self.vectorizer.transform([desc])
-        pred = self.classifier.predict(X)
-        return pred[0]
+        if not hasattr(classifier, "classes_"):
+            classifier.partial_fit(X, [cat], classes=[cat])
+            return
+        if cat not in classifier.classes_:
+            # partial_fit only accepts the classes it was first given, so grow the
+            # class list (with empty counts) before learning a new category.
+            classifier.classes_ = np.append(classifier.classes_, cat)
+            classifier.class_count_ = np.append(classifier.class_count_, 0.0)
+            classifier.feature_count_ = np.vstack(
+                [classifier.feature_count_, np.zeros((1, classifier.feature_count_.shape[1]))])
+        classifier.partial_fit(X, [cat])
+
+    def start_background_refit(self, interval):
+        """Refit the model from all training samples every `interval` seconds, off the caller's thread."""
+        self.stop_background_refit()
+        self._refit_timer = threading.Timer(interval, self._background_refit, args=(interval,))
+        self._refit_timer.daemon = True
+        self._refit_timer.start()
+
+    def stop_background_refit(self):
+        if self._refit_timer is not None:
+            self._refit_timer.cancel()
+            self._refit_timer = None
+
+    def _background_refit(self, interval):
+        samples = list(self.training_samples)
+        if samples:
+            classifier = self._fit(samples)
+            with self._model_lock:
+                # Samples learned incrementally while the refit was running.
+                for desc, cat in self.training_samples[len(samples):]:
+                    self._learn(classifier, desc, cat)
+                self.classifier = classifier
+                self.is_fitted = True
+                self.model_version += 1
+                self.save_model()
+        self.start_background_refit(interval)
+
+    # -------------------------
+    # Model artifact
+    # -------------------------
+    @staticmethod
+    def _samples_hash(samples):
+        h = hashlib.sha256()
+        for desc, cat in samples:
+            h.update(json.dumps([desc, cat]).encode("utf-8"))
+            h.update(b"\n")
+        return h.hexdigest()
+
+    def save_model(self):
+        """Write the classifier's class list and count arrays to storage.model_file."""
+        with self._save_lock:
+            classifier = self.classifier
+            if not self.is_fitted or not hasattr(classifier, "classes_"):
+                return
+            n_samples = len(self.training_samples)
+            tmp_file = self.storage.model_file + ".tmp"
+            with open(tmp_file, "wb") as f:
+                np.savez(
+                    f,
+                    format_version=MODEL_FORMAT_VERSION,
+                    n_features=HASH_FEATURES,
+                    n_samples=n_samples,
+                    samples_hash=self._samples_hash(self.training_samples[:n_samples]),
+                    classes=np.asarray(classifier.classes_, dtype=str),
+                    class_count=classifier.class_count_,
+                    feature_count=classifier.feature_count_,
+                )
+            os.replace(tmp_file, self.storage.model_file)
+
+    def load_model(self):
+        """
+        Load the saved classifier if it was fitted on (a prefix of) the current training samples.
+        Returns False when there is no usable artifact and a full fit is needed.
+        """
+        if not os.path.exists(self.storage.model_file):
+            return False
+        try:
+            with np.load(self.storage.model_file) as data:
+                if int(data["format_version"]) != MODEL_FORMAT_VERSION or int(data["n_features"]) != HASH_FEATURES:
+                    return False
+                n_samples = int(data["n_samples"])
+                if n_samples > len(self.training_samples) or \
+                        str(data["samples_hash"]) != self._samples_hash(self.training_samples[:n_samples]):
+                    return False
+                classes = data["classes"].astype(object)
+                class_count = data["class_count"]
+                feature_count = data["feature_count"]
+        except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+            # Missing, truncated or corrupt artifact: refit instead.
+            return False
+
+        classifier = MultinomialNB()
+        classifier.classes_ = classes
+        classifier.class_count_ = class_count
+        classifier.feature_count_ = feature_count
+        classifier.n_features_in_ = HASH_FEATURES
+        # What MultinomialNB.fit derives from the counts (default alpha=1.0, fit_prior=True).
+        smoothed_fc = feature_count + classifier.alpha
+        classifier.feature_log_prob_ = np.log(smoothed_fc) - np.log(smoothed_fc.sum(axis=1, keepdims=True))
+        classifier.class_log_prior_ = np.log(class_count) - np.log(class_count.sum())
+        # Samples added after the artifact was written.
+        for desc, cat in self.training_samples[n_samples:]:
+            self._learn(classifier, desc, cat)
+        with self._model_lock:
+            self.classifier = classifier
+            self.is_fitted = True
+            self.model_version += 1
+        return True
+
+    @staticmethod
+    def _normalize_desc(desc):
+        # The vectorizer lower-cases and tokenizes, so case and spacing never change a prediction.
+        return " ".join(desc.lower().split())
+
+    def _cache_lookup(self, key):
+        if self._cache_version != self.model_version:
+            self._prediction_cache.clear()
+            self._cache_version = self.model_version
+        hit = self._prediction_cache.get(key)
+        if hit is None:
+            self.cache_misses += 1
+            return None
+        self._prediction_cache.move_to_end(key)
+        self.cache_hits += 1
+        return hit
+
+    def _cache_store(self, key, hit):
+        self._prediction_cache[key] = hit
+        if len(self._prediction_cache) > PREDICTION_CACHE_SIZE:
+            self._prediction_cache.popitem(last=False)
+
+    def prediction_cache_stats(self):
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "size": len(self._prediction_cache),
+            "model_version": self.model_version
+        }
+
+    def categorizer_stats(self):
+        """Lookups and hit rate per categorizer tier, low-confidence answers and pending reviews."""
+        stats = self.categorizer.stats()
+        stats["confidence_threshold"] = CONFIDENCE_THRESHOLD
+        stats["pending_reviews"] = len(self.review_queue)
+        return stats
+
+    def _model_predict(self, keys):
+        """
+        {key: (category, confidence)} from the classifier for normalized descriptions. Cache
+        misses are vectorized and scored together in one predict_proba call.
+        """
+        if not self.is_fitted:
+            return {key: ("Misc", 0.0) for key in keys}
+        predicted = {}
+        missing = []
+        for key in keys:
+            hit = self._cache_lookup(key)
+            if hit is None:
+                missing.append(key)
+            else:
+                predicted[key] = hit
+        if missing:
+            classifier = self.classifier
+            proba = classifier.predict_proba(self.vectorizer.transform(missing))
+            best = proba.argmax(axis=1)
+            for key, cat, conf in zip(missing, classifier.classes_[best].tolist(),
+                                      proba[np.arange(len(missing)), best].tolist()):
+                predicted[key] = (cat, conf)
+                self._cache_store(key, (cat, conf))
+        return predicted
+
+    def categorize(self, descs):
+        """
+        Categorize many descriptions: [(category, tier, confidence)] in order, where tier is
+        "exact", "keyword" or "model". Only descriptions neither rule tier resolves reach
+        the model, all scored together in one batch.
+        """
+        keys = [self._normalize_desc(desc) for desc in descs]
+        results = []
+        rules = {}
+        for key in keys:
+            if key not in rules:
+                cat = self.categorizer.lookup_exact(key)
+                if cat is not None:
+                    rules[key] = (cat, "exact", EXACT_CONFIDENCE)
+                else:
+                    hit = self.categorizer.lookup_keyword(key)
+                    rules[key] = (hit[0], "keyword", hit[1]) if hit is not None else None
+            results.append(rules[key])
+        unknown = [key for key, result in rules.items() if result is None]
+        if unknown:
+            predicted = self._model_predict(unknown)
+            results = [
+                result if result is not None else (predicted[key][0], "model", predicted[key][1])
+                for key, result in zip(keys, results)
+            ]
+        for cat, tier, conf in results:
+            self.categorizer.record(tier, conf, CONFIDENCE_THRESHOLD)
+        return results
+
+    def predict_category(self, desc):
+        return self.categorize([desc])[0][0]
+
+    def predict_categories(self, descs):
+        """Predict the categories of many descriptions (see categorize())."""
+        return [cat for cat, tier, conf in self.categorize(descs)]
+
+    # -------------------------
+    # Review queue
+    # -------------------------
+    def _queue_review(self, date_ym, desc, amount, cat, conf):
+        if conf < CONFIDENCE_THRESHOLD:
+            self.review_queue.append({
+                "user": self.username,
+                "date_ym": date_ym,
+                "desc": desc,
+                "amount": amount,
+                "category": cat,
+                "confidence": conf
+            })
+
+    def pending_reviews(self):
+        """The current user's (or the anonymous) low-confidence transactions, oldest first."""
+        return [entry for entry in self.review_queue if entry["user"] == self.username]
 
     def _convert_income(self, income_str):
         """Convert strings like '15k' to float 15000."""
@@ -115,23 +468,24 @@ class SpentML:
         """
         if not self.username:
             return
+        # Check if adjustments for this month have already been applied (no file access needed).
+        if (self.username, date_ym) in self.adjusted_months:
+            return
         users = load_users()
         if self.username not in users:
             return
         user_record = users[self.username]
         onboarding = user_record.get("onboarding", {})
-        # Check if adjustments for this month have already been applied.
-        if self.user_spending[self.username].get(date_ym, {}).get("__adjusted__", False):
-            return
 
         # Process recurring income.
+        deltas = defaultdict(float)
         pay_type = onboarding.get("pay_type", "monthly").lower()
         monthly_income_str = onboarding.get("monthly_income", "0")
         income_value = self._convert_income(monthly_income_str)
         if pay_type == "monthly":
-            self.user_spending[self.username][date_ym]["income"] -= income_value
+            deltas["income"] -= income_value
         elif pay_type == "annually":
-            self.user_spending[self.username][date_ym]["income"] -= income_value / 4
+            deltas["income"] -= income_value / 4
 
         # Process recurring bills (expenses).
         bills = onboarding.get("bills", [])
@@ -144,59 +498,169 @@ class SpentML:
             bill_cat = bill.get("description", "Misc")
             if bill_amount != 0:
                 if freq == "monthly":
-                    self.user_spending[self.username][date_ym][bill_cat] += bill_amount
+                    deltas[bill_cat] += bill_amount
                 elif freq == "weekly":
-                    self.user_spending[self.username][date_ym][bill_cat] += 4 * bill_amount
+                    deltas[bill_cat] += 4 * bill_amount
 
-        # Mark this month as adjusted.
-        self.user_spending[self.username][date_ym]["__adjusted__"] = True
-        self.save_data()
+        self._apply_adjust(self.username, date_ym, deltas)
+        self._record({"op": "adjust", "user": self.username, "date_ym": date_ym, "deltas": deltas})
+
+    def _apply_adjust(self, user, date_ym, deltas):
+        for cat, delta in deltas.items():
+            self._add_spend(user, date_ym, cat, delta)
+        # Mark this month as adjusted (kept outside the spending dict so it never shows up as a category).
+        self.adjusted_months.add((user, date_ym))
+        self.data_version += 1
 
     def add_transaction(self, date_ym: str, desc: str, amount: float):
-        cat = self.predict_category(desc)
-        self.monthly_spend[date_ym][cat] += amount
+        """Categorize and add one transaction. Returns (category, confidence)."""
+        cat, tier, conf = self.categorize([desc])[0]
         if self.username:
             # Ensure recurring income/expense adjustments for this month are applied.
             self.apply_onboarding_adjustments(date_ym)
-            self.user_spending[self.username][date_ym][cat] += amount
-        self.transactions.append({
+        self._apply_add(self.username, date_ym, desc, amount, cat)
+        self._record(self._add_record(date_ym, desc, amount, cat))
+        self._queue_review(date_ym, desc, amount, cat, conf)
+        return cat, conf
+
+    def add_transactions_bulk(self, rows):
+        """
+        Add many (date_ym, desc, amount) rows at once: the descriptions the rule tiers miss are
+        categorized in a single sparse-matrix predict_proba, onboarding adjustments run once per
+        distinct month, and all the resulting records are persisted with one storage write at
+        the end. Low-confidence rows are queued for review. Returns the categories, in row order.
+        """
+        rows = list(rows)
+        if not rows:
+            return []
+        results = self.categorize([row[1] for row in rows])
+        cats = [cat for cat, tier, conf in results]
+        self._batch = []
+        try:
+            if self.username:
+                for date_ym in dict.fromkeys(row[0] for row in rows):
+                    self.apply_onboarding_adjustments(date_ym)
+            self._apply_add_many(self.username, rows, cats)
+            for (date_ym, desc, amount), cat in zip(rows, cats):
+                self._batch.append(self._add_record(date_ym, desc, amount, cat))
+        finally:
+            records, self._batch = self._batch, None
+            self.storage.record_many(self, records)
+        for (date_ym, desc, amount), (cat, tier, conf) in zip(rows, results):
+            self._queue_review(date_ym, desc, amount, cat, conf)
+        return cats
+
+    def _add_record(self, date_ym, desc, amount, cat):
+        return {
+            "op": "add",
+            "user": self.username,
             "date_ym": date_ym,
             "desc": desc,
             "amount": amount,
             "category": cat
-        })
-        self.save_data()
+        }
+
+    def _apply_add(self, user, date_ym, desc, amount, cat, update_global=True):
+        if update_global:
+            self._add_spend(None, date_ym, cat, amount)
+        if user:
+            self._add_spend(user, date_ym, cat, amount)
+        t = {
+            "date_ym": date_ym,
+            "desc": desc,
+            "amount": amount,
+            "category": cat,
+            "user": user
+        }
+        self._index_transaction(len(self.transactions), t)
+        self.transactions.append(t)
+        self.data_version += 1
+
+    def _apply_add_many(self, user, rows, cats):
+        """_apply_add for a batch; each spending matrix is updated with one scatter-add."""
+        months = np.array([ym_to_index(row[0]) for row in rows], dtype=np.int64)
+        amounts = np.array([row[2] for row in rows], dtype=np.float64)
+        categories = list(dict.fromkeys(cats))
+        codes = {cat: code for code, cat in enumerate(categories)}
+        cat_codes = np.array([codes[cat] for cat in cats], dtype=np.int64)
+        self.monthly_spend.add_many(months, categories, cat_codes, amounts)
+        if user:
+            self.user_spending[user].add_many(months, categories, cat_codes, amounts)
+        start = len(self.transactions)
+        added = [
+            {"date_ym": date_ym, "desc": desc, "amount": amount, "category": cat, "user": user}
+            for (date_ym, desc, amount), cat in zip(rows, cats)
+        ]
+        for offset, t in enumerate(added):
+            self._index_transaction(start + offset, t)
+        self.transactions.extend(added)
+        self.data_version += 1
 
     def correct_category(self, desc: str, new_cat: str):
-        for t in self.transactions:
+        moves = self._apply_correct(self.username, desc, new_cat)
+        self._record({"op": "correct", "user": self.username, "desc": desc, "category": new_cat, "moves": moves})
+        self.categorizer.correct(self._normalize_desc(desc), new_cat)
+        self.partial_fit_sample(desc, new_cat)
+        # The corrected description is settled; drop it from the review queue.
+        reviewed = [entry for entry in self.review_queue
+                    if entry["user"] == self.username and entry["desc"] == desc]
+        for entry in reviewed:
+            self.review_queue.remove(entry)
+
+    def _apply_correct(self, user, desc, new_cat, update_global=True):
+        """Returns the moved amounts as [date_ym, old_category, amount] entries."""
+        # Only the transactions of the given user (or the anonymous ones) are re-categorized,
+        # and the index hands us just the rows with this description.
+        moves = []
+        for pos in self._desc_index.get((user, self._normalize_desc(desc)), ()):
+            t = self.transactions[pos]
             if t["desc"] == desc and t["category"] != new_cat:
                 old_cat = t["category"]
                 amount = t["amount"]
                 date_ym = t["date_ym"]
-                self.monthly_spend[date_ym][old_cat] -= amount
-                self.monthly_spend[date_ym][new_cat] += amount
-                if self.username:
-                    self.user_spending[self.username][date_ym][old_cat] -= amount
-                    self.user_spending[self.username][date_ym][new_cat] += amount
-                t["category"] = new_cat
-        self.partial_fit_sample(desc, new_cat)
-        self.save_data()
+                if update_global:
+                    self._add_spend(None, date_ym, old_cat, -amount)
+                    self._add_spend(None, date_ym, new_cat, amount)
+                if user:
+                    self._add_spend(user, date_ym, old_cat, -amount)
+                    self._add_spend(user, date_ym, new_cat, amount)
+                self.transactions.set_category(pos, new_cat)
+                moves.append([date_ym, old_cat, amount])
+        if moves:
+            self.data_version += 1
+        return moves
+
+    def transactions_for_month(self, date_ym: str):
+        """Return the current user's (or the anonymous) transactions for one month."""
+        return [self.transactions[pos] for pos in self._month_index.get((self.username, date_ym), ())]
+
+    def transaction_totals(self):
+        """
+        {"YYYY-MM": {category: total}} summed from the current user's (or the anonymous)
+        transactions alone, i.e. without onboarding adjustments. Vectorized over the columns.
+        """
+        return self.transactions.month_category_totals(self.transactions.user_mask(self.username))
+
+    def month_spending(self, date_ym: str):
+        """
+        Return {category: amount} for one month, for the current user (or globally
+        when there is no user). The lookup is answered by the storage backend.
+        """
+        return self.storage.month_spending(self, self.username, date_ym)
+
+    def _add_spend(self, user, date_ym, cat, delta):
+        """Add delta to one aggregate cell (user None = the global one)."""
+        self._spending(user).add(date_ym, cat, delta)
+
+    def _spending(self, user):
+        return self.user_spending[user] if user else self.monthly_spend
 
     def compare_months(self, m1: str, m2: str):
-        if self.username:
-            s1 = self.user_spending[self.username].get(m1, {})
-            s2 = self.user_spending[self.username].get(m2, {})
-        else:
-            s1 = self.monthly_spend.get(m1, {})
-            s2 = self.monthly_spend.get(m2, {})
-        cats = set(s1.keys()) | set(s2.keys())
-        diffs = []
-        for c in cats:
-            old_v = s1.get(c, 0.0)
-            new_v = s2.get(c, 0.0)
-            change = new_v - old_v
-            diffs.append((c, old_v, new_v, change))
-        diffs.sort(key=lambda x: abs(x[3]), reverse=True)
+        """
+        Compare two months category by category, biggest change first. The differences are
+        column slices of the spending matrix (cached for adjacent months until either changes).
+        """
+        diffs = self._spending(self.username).differences(m1, m2)
         if diffs:
             c, ov, nv, ch = diffs[0]
             if ch >= 0:
@@ -209,3 +673,29 @@ class SpentML:
             'differences': diffs,
             'top_change_summary': msg
         }
+
+    def spending_trend(self, start_ym: str, end_ym: str):
+        """[("YYYY-MM", total spent)] for every month from start_ym to end_ym, from the running totals."""
+        return self._spending(self.username).trend(start_ym, end_ym)
+
+
+# -------------------------
+# Shared engine
+# -------------------------
+# One engine per storage backend, shared by every screen and rebound on login/logout.
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(username=None, backend=None):
+    """
+    Return the shared SpentML engine bound to `username`. The data and model are loaded by
+    the first call only; later calls rebind the same engine to the given user.
+    """
+    backend = backend or ML_STORAGE_BACKEND
+    with _engines_lock:
+        engine = _engines.get(backend)
+        if engine is None:
+            engine = _engines[backend] = SpentML(username=username, storage=make_storage(backend))
+            return engine
+    return engine.bind_user(username)
@@ -0,0 +1,458 @@
+import json
+import os
+import sqlite3
+from collections import defaultdict
+from urllib.parse import quote, unquote
+
+from Backend.SpentJournal import SpentJournal
+
+ML_DATA_FILE = "spent_ml_data.json"
+# Mutations are appended here and folded into ML_DATA_FILE on compaction.
+ML_JOURNAL_FILE = "spent_ml_data.journal"
+# One snapshot + journal per user ("<username>.json" / "<username>.journal", URL-quoted).
+ML_USERS_DIR = "spent_ml_users"
+# Written into ML_DATA_FILE once the per-user shards exist; older files are migrated.
+LAYOUT_VERSION = 2
+# Number of journal records after which the journal is compacted into a new snapshot.
+COMPACT_EVERY = 1000
+# Database used by the SQLite backend.
+ML_DB_FILE = "spent_ml_data.db"
+# Saved classifier (class list + Naive Bayes count arrays), kept next to the data.
+ML_MODEL_FILE = "spent_ml_model.npz"
+
+# Scope name under which the SQLite backend stores the global (all users) aggregates
+# and the transactions added without a logged-in user.
+GLOBAL_SCOPE = ""
+
+
+def make_storage(kind="json"):
+    """Return a storage backend by name: "json" (default) or "sqlite"."""
+    if kind == "json":
+        return JSONStorage()
+    if kind == "sqlite":
+        return SQLiteStorage()
+    raise ValueError(f"Unknown SpentML storage backend: {kind}")
+
+
+class JSONStorage:
+    """
+    The default backend: JSON snapshots plus append-only journals, sharded per user.
+
+    ML_DATA_FILE (with ML_JOURNAL_FILE) holds what every user shares: the training samples,
+    the global monthly aggregates and the transactions added without a logged-in user.
+    Each user's spending, adjusted months and transactions live in their own snapshot and
+    journal under ML_USERS_DIR, and only the active user's shard is loaded (bind_user()
+    swaps it). A user's transaction or correction goes to their shard journal in full and
+    to the global journal as a "spend" record with just the change to the aggregates, so
+    one user's writes never rewrite another user's data.
+
+    load() replays each journal tail on top of its snapshot, and a journal is compacted into
+    a fresh snapshot every COMPACT_EVERY records (or whenever save() is called).
+
+    The older single-file layout (every user's data in ML_DATA_FILE) is split into shards
+    the first time it is loaded.
+    """
+
+    def __init__(self, data_file=ML_DATA_FILE, journal_file=ML_JOURNAL_FILE, compact_every=COMPACT_EVERY,
+                 model_file=ML_MODEL_FILE, users_dir=ML_USERS_DIR):
+        self.data_file = data_file
+        self.model_file = model_file
+        self.compact_every = compact_every
+        self.journal = SpentJournal(journal_file)
+        self.users_dir = users_dir
+        # The loaded user's shard journal (None when no user is bound).
+        self.shard_user = None
+        self.shard_journal = None
+
+    # -------------------------
+    # Loading
+    # -------------------------
+    def load(self, engine):
+        data = _read_json(self.data_file)
+        if data is None and not os.path.exists(self.journal.path):
+            # Fresh install: write an empty snapshot so the journal is never taken for the old layout.
+            self._write_global(engine)
+            self._load_user(engine)
+            return
+        if data is None or data.get("layout") != LAYOUT_VERSION:
+            self._migrate(engine, data or {})
+            return
+        engine.training_samples = data.get("training_samples", [])
+        for ym, cat_dict in data.get("monthly_spend", {}).items():
+            engine.monthly_spend[ym] = cat_dict
+        engine._set_transactions(data.get("transactions", []))
+        for record in self.journal.replay(after_seq=data.get("journal_seq", 0)):
+            engine._replay(record)
+        self._load_user(engine)
+
+    def bind_user(self, engine, username):
+        """Swap the previous user's rows for the shard of engine.username (already set)."""
+        self._drop_users(engine)
+        self._load_user(engine)
+
+    def _load_user(self, engine):
+        user = engine.username
+        self.shard_user = user
+        self.shard_journal = None
+        if not user:
+            return
+        data_file, journal_file = self._shard_paths(user)
+        # A new user has no shard yet, but their first record is appended to its journal.
+        os.makedirs(self.users_dir, exist_ok=True)
+        self.shard_journal = SpentJournal(journal_file)
+        data = _read_json(data_file) or {}
+        for ym, cat_dict in data.get("user_spending", {}).items():
+            engine.user_spending[user][ym] = cat_dict
+        for ym in data.get("adjusted_months", []):
+            engine.adjusted_months.add((user, ym))
+        engine._set_transactions(list(engine.transactions) + data.get("transactions", []))
+        # The global journal already has these records' effect on monthly_spend.
+        for record in self.shard_journal.replay(after_seq=data.get("journal_seq", 0)):
+            engine._replay(record, update_global=False)
+
+    @staticmethod
+    def _drop_users(engine):
+        """Forget every user's rows, keeping the shared data and anonymous transactions."""
+        engine.user_spending.clear()
+        engine.adjusted_months.clear()
+        engine._set_transactions([t for t in engine.transactions if not t.get("user")])
+
+    def _shard_paths(self, user):
+        base = os.path.join(self.users_dir, quote(user, safe=""))
+        return base + ".json", base + ".journal"
+
+    def _migrate(self, engine, data):
+        """One-time split of the single-file layout (snapshot + journal) into per-user shards."""
+        engine.training_samples = data.get("training_samples", [])
+        for ym, cat_dict in data.get("monthly_spend", {}).items():
+            engine.monthly_spend[ym] = cat_dict
+        for user, month_dict in data.get("user_spending", {}).items():
+            for ym, cat_dict in month_dict.items():
+                # Older snapshots kept the adjusted-month flag inside the spending dict.
+                if cat_dict.pop("__adjusted__", False):
+                    engine.adjusted_months.add((user, ym))
+                engine.user_spending[user][ym] = cat_dict
+        for user, ym in data.get("adjusted_months", []):
+            engine.adjusted_months.add((user, ym))
+        engine._set_transactions(data.get("transactions", []))
+        for record in self.journal.replay(after_seq=data.get("journal_seq", 0)):
+            engine._replay(record)
+
+        transactions_by_user = defaultdict(list)
+        for t in engine.transactions:
+            if t.get("user"):
+                transactions_by_user[t["user"]].append(t)
+        users = set(engine.user_spending) | set(transactions_by_user) | {user for user, _ in engine.adjusted_months}
+        # Shards first: the global snapshot is only rewritten (in the new layout) once they all exist.
+        for user in users:
+            self._write_shard(engine, user, transactions_by_user[user], SpentJournal(self._shard_paths(user)[1]))
+        self._drop_users(engine)
+        self._write_global(engine)
+        self._load_user(engine)
+
+    # -------------------------
+    # Writing
+    # -------------------------
+    def save(self, engine):
+        """Write the global snapshot and the loaded user's shard, and truncate their journals."""
+        self._write_global(engine)
+        if self.shard_user:
+            self._save_shard(engine)
+
+    def _write_global(self, engine):
+        _write_json(self.data_file, {
+            "layout": LAYOUT_VERSION,
+            "training_samples": engine.training_samples,
+            "monthly_spend": {ym: dict(cat_dict) for ym, cat_dict in engine.monthly_spend.items()},
+            "transactions": [t for t in engine.transactions if not t.get("user")],
+            "journal_seq": self.journal.seq
+        })
+        self.journal.truncate()
+
+    def _save_shard(self, engine):
+        user = self.shard_user
+        transactions = [t for t in engine.transactions if t.get("user") == user]
+        self._write_shard(engine, user, transactions, self.shard_journal)
+
+    def _write_shard(self, engine, user, transactions, journal):
+        os.makedirs(self.users_dir, exist_ok=True)
+        _write_json(self._shard_paths(user)[0], {
+            "user_spending": {ym: dict(cat_dict) for ym, cat_dict in engine.user_spending.get(user, {}).items()},
+            "adjusted_months": sorted(ym for u, ym in engine.adjusted_months if u == user),
+            "transactions": transactions,
+            "journal_seq": journal.seq
+        })
+        journal.truncate()
+
+    def record(self, engine, record):
+        """Persist one mutation as journal records, compacting when a journal gets long."""
+        self.record_many(engine, [record])
+
+    def record_many(self, engine, records):
+        """Route the records to the user's shard journal and the global journal, one write each."""
+        global_records = []
+        shard_records = []
+        changes = defaultdict(float)
+        for record in records:
+            op = record.get("op")
+            if op == "sample" or not record.get("user"):
+                global_records.append(record)
+                continue
+            shard_records.append(record)
+            if op == "add":
+                changes[(record["date_ym"], record["category"])] += record["amount"]
+            elif op == "correct":
+                for date_ym, old_cat, amount in record.get("moves", ()):
+                    changes[(date_ym, old_cat)] -= amount
+                    changes[(date_ym, record["category"])] += amount
+        if changes:
+            global_records.append({"op": "spend", "changes": [[ym, cat, delta] for (ym, cat), delta in changes.items()]})
+
+        if shard_records:
+            self.shard_journal.append_many(shard_records)
+            if self.shard_journal.pending >= self.compact_every:
+                self._save_shard(engine)
+        if global_records:
+            self.journal.append_many(global_records)
+            if self.journal.pending >= self.compact_every:
+                self._write_global(engine)
+
+    def month_spending(self, engine, user, date_ym):
+        if user:
+            return dict(engine.user_spending[user].get(date_ym, {}))
+        return dict(engine.monthly_spend.get(date_ym, {}))
+
+
+def _read_json(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _write_json(path, data):
+    """Write atomically via a temp file."""
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_file, path)
+
+
+class SQLiteStorage:
+    """
+    An SQLite backend with one table each for transactions, training samples and
+    monthly aggregates, indexed on (username, date_ym, category).
+
+    load() only reads the training samples, the global aggregates and the rows that
+    belong to the engine's user (bind_user() swaps in another user's rows), and month_spending() is answered by the database
+    instead of the in-memory dicts. Every mutation is written in its own transaction.
+
+    If the database does not exist yet, the JSON data (snapshot, journal and user shards,
+    if any) is imported into it once.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY,
+            username TEXT NOT NULL,
+            date_ym TEXT NOT NULL,
+            description TEXT NOT NULL,
+            amount REAL NOT NULL,
+            category TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_transactions_user_month_cat
+            ON transactions (username, date_ym, category);
+        CREATE INDEX IF NOT EXISTS idx_transactions_user_desc
+            ON transactions (username, description);
+
+        CREATE TABLE IF NOT EXISTS training_samples (
+            id INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            category TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS monthly_spend (
+            username TEXT NOT NULL,
+            date_ym TEXT NOT NULL,
+            category TEXT NOT NULL,
+            amount REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (username, date_ym, category)
+        );
+
+        CREATE TABLE IF NOT EXISTS adjusted_months (
+            username TEXT NOT NULL,
+            date_ym TEXT NOT NULL,
+            PRIMARY KEY (username, date_ym)
+        );
+    """
+
+    def __init__(self, db_file=ML_DB_FILE, legacy_data_file=ML_DATA_FILE, legacy_journal_file=ML_JOURNAL_FILE,
+                 model_file=ML_MODEL_FILE, legacy_users_dir=ML_USERS_DIR):
+        self.model_file = model_file
+        is_new = not os.path.exists(db_file)
+        self.conn = sqlite3.connect(db_file)
+        self.conn.executescript(self.SCHEMA)
+        if is_new:
+            self._import_json(legacy_data_file, legacy_journal_file, legacy_users_dir)
+
+    # -------------------------
+    # Loading
+    # -------------------------
+    def load(self, engine):
+        cur = self.conn.cursor()
+        engine.training_samples = [
+            [desc, cat] for desc, cat in cur.execute("SELECT description, category FROM training_samples ORDER BY id")
+        ]
+        rows = cur.execute(
+            "SELECT date_ym, category, amount FROM monthly_spend WHERE username = ?", (GLOBAL_SCOPE,))
+        for ym, cat, amount in rows:
+            engine.monthly_spend[ym][cat] = amount
+        self._load_user(engine)
+
+    def bind_user(self, engine, username):
+        """Swap the previous user's rows for those of engine.username (already set)."""
+        engine.user_spending.clear()
+        engine.adjusted_months.clear()
+        self._load_user(engine)
+
+    def _load_user(self, engine):
+        scope = engine.username or GLOBAL_SCOPE
+        cur = self.conn.cursor()
+        if engine.username:
+            rows = cur.execute(
+                "SELECT date_ym, category, amount FROM monthly_spend WHERE username = ?", (scope,))
+            for ym, cat, amount in rows:
+                engine.user_spending[scope][ym][cat] = amount
+            rows = cur.execute("SELECT date_ym FROM adjusted_months WHERE username = ?", (scope,))
+            for (ym,) in rows:
+                engine.adjusted_months.add((scope, ym))
+        rows = cur.execute(
+            "SELECT date_ym, description, amount, category FROM transactions WHERE username = ? ORDER BY id", (scope,))
+        engine._set_transactions([
+            {"date_ym": ym, "desc": desc, "amount": amount, "category": cat, "user": engine.username}
+            for ym, desc, amount, cat in rows
+        ])
+
+    def month_spending(self, engine, user, date_ym):
+        rows = self.conn.execute(
+            "SELECT category, amount FROM monthly_spend WHERE username = ? AND date_ym = ?",
+            (user or GLOBAL_SCOPE, date_ym))
+        return dict(rows)
+
+    # -------------------------
+    # Writing
+    # -------------------------
+    def record(self, engine, record):
+        self.record_many(engine, [record])
+
+    def record_many(self, engine, records):
+        """Write several records in a single database transaction."""
+        with self.conn:
+            for record in records:
+                self._write(record)
+
+    def save(self, engine):
+        """Every record is committed as it is written, so there is nothing left to flush."""
+        self.conn.commit()
+
+    def _add_spend(self, scope, date_ym, cat, delta):
+        self.conn.execute(
+            "INSERT INTO monthly_spend (username, date_ym, category, amount) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (username, date_ym, category) DO UPDATE SET amount = amount + excluded.amount",
+            (scope, date_ym, cat, delta))
+
+    def _write(self, record, update_global=True):
+        # update_global=False is only used when importing JSON shard journals, whose effect on the
+        # global aggregates comes from the "spend" records in the global journal.
+        op = record.get("op")
+        user = record.get("user")
+        if op == "add":
+            self.conn.execute(
+                "INSERT INTO transactions (username, date_ym, description, amount, category) VALUES (?, ?, ?, ?, ?)",
+                (user or GLOBAL_SCOPE, record["date_ym"], record["desc"], record["amount"], record["category"]))
+            if update_global:
+                self._add_spend(GLOBAL_SCOPE, record["date_ym"], record["category"], record["amount"])
+            if user:
+                self._add_spend(user, record["date_ym"], record["category"], record["amount"])
+        elif op == "adjust":
+            for cat, delta in record["deltas"].items():
+                self._add_spend(user, record["date_ym"], cat, delta)
+            self.conn.execute(
+                "INSERT OR IGNORE INTO adjusted_months (username, date_ym) VALUES (?, ?)",
+                (user, record["date_ym"]))
+        elif op == "correct":
+            scope = user or GLOBAL_SCOPE
+            new_cat = record["category"]
+            moved = self.conn.execute(
+                "SELECT date_ym, category, SUM(amount) FROM transactions "
+                "WHERE username = ? AND description = ? AND category != ? GROUP BY date_ym, category",
+                (scope, record["desc"], new_cat)).fetchall()
+            for date_ym, old_cat, amount in moved:
+                if update_global:
+                    self._add_spend(GLOBAL_SCOPE, date_ym, old_cat, -amount)
+                    self._add_spend(GLOBAL_SCOPE, date_ym, new_cat, amount)
+                if user:
+                    self._add_spend(user, date_ym, old_cat, -amount)
+                    self._add_spend(user, date_ym, new_cat, amount)
+            self.conn.execute(
+                "UPDATE transactions SET category = ? WHERE username = ? AND description = ? AND category != ?",
+                (new_cat, scope, record["desc"], new_cat))
+        elif op == "sample":
+            self.conn.execute(
+                "INSERT INTO training_samples (description, category) VALUES (?, ?)", (record["desc"], record["category"]))
+        elif op == "spend":
+            for date_ym, cat, delta in record["changes"]:
+                self._add_spend(GLOBAL_SCOPE, date_ym, cat, delta)
+
+    def _import_json(self, data_file, journal_file, users_dir):
+        """One-time import of the JSON snapshot + journal (and user shards) into a freshly created database."""
+        snapshot_seq = 0
+        with self.conn:
+            if os.path.exists(data_file):
+                with open(data_file, "r") as f:
+                    data = json.load(f)
+                self.conn.executemany(
+                    "INSERT INTO training_samples (description, category) VALUES (?, ?)",
+                    [(desc, cat) for desc, cat in data.get("training_samples", [])])
+                for ym, cat_dict in data.get("monthly_spend", {}).items():
+                    for cat, amount in cat_dict.items():
+                        self._add_spend(GLOBAL_SCOPE, ym, cat, amount)
+                for user, ym in data.get("adjusted_months", []):
+                    self.conn.execute(
+                        "INSERT OR IGNORE INTO adjusted_months (username, date_ym) VALUES (?, ?)", (user, ym))
+                for user, month_dict in data.get("user_spending", {}).items():
+                    for ym, cat_dict in month_dict.items():
+                        for cat, amount in cat_dict.items():
+                            if cat == "__adjusted__":
+                                self.conn.execute(
+                                    "INSERT OR IGNORE INTO adjusted_months (username, date_ym) VALUES (?, ?)",
+                                    (user, ym))
+                            else:
+                                self._add_spend(user, ym, cat, amount)
+                self.conn.executemany(
+                    "INSERT INTO transactions (username, date_ym, description, amount, category) VALUES (?, ?, ?, ?, ?)",
+                    [(t.get("user") or GLOBAL_SCOPE, t["date_ym"], t["desc"], t["amount"], t["category"])
+                     for t in data.get("transactions", [])])
+                snapshot_seq = data.get("journal_seq", 0)
+            for record in SpentJournal(journal_file).replay(after_seq=snapshot_seq):
+                self._write(record)
+            if os.path.isdir(users_dir):
+                # A user who never reached a compaction only has a shard journal.
+                names = {os.path.splitext(name)[0] for name in os.listdir(users_dir)
+                         if name.endswith((".json", ".journal"))}
+                for name in sorted(names):
+                    self._import_shard(unquote(name), os.path.join(users_dir, name))
+
+    def _import_shard(self, user, base):
+        data = _read_json(base + ".json") or {}
+        for ym, cat_dict in data.get("user_spending", {}).items():
+            for cat, amount in cat_dict.items():
+                self._add_spend(user, ym, cat, amount)
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO adjusted_months (username, date_ym) VALUES (?, ?)",
+            [(user, ym) for ym in data.get("adjusted_months", [])])
+        self.conn.executemany(
+            "INSERT INTO transactions (username, date_ym, description, amount, category) VALUES (?, ?, ?, ?, ?)",
+            [(user, t["date_ym"], t["desc"], t["amount"], t["category"]) for t in data.get("transactions", [])])
+        for record in SpentJournal(base + ".journal").replay(after_seq=data.get("journal_seq", 0)):
+            self._write(record, update_global=False)
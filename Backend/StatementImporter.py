@@ -0,0 +1,268 @@
+import csv
+import datetime
+import os
+from itertools import chain, islice
+
+# Number of statement rows handed to SpentML.add_transactions_bulk at a time.
+CHUNK_SIZE = 1000
+
+# Header names (lower-cased) recognised in CSV exports.
+CSV_DATE_COLUMNS = ["date", "transaction date", "posted date", "posting date", "booking date", "value date"]
+CSV_DESC_COLUMNS = ["description", "desc", "memo", "payee", "details", "narrative", "name", "merchant"]
+CSV_AMOUNT_COLUMNS = ["amount", "value", "transaction amount"]
+CSV_DEBIT_COLUMNS = ["debit", "withdrawal", "money out", "paid out"]
+CSV_CREDIT_COLUMNS = ["credit", "deposit", "money in", "paid in"]
+
+# Date formats tried, in order, when a date is not in ISO form: one list for statements
+# that write the day first (03/05/2025 = 3 May) and one for month first (= 5 March).
+DATE_FORMATS = ["%d/%m/%Y", "%d.%m.%Y", "%d-%m-%Y", "%d/%m/%y", "%d-%m-%y", "%d %b %Y", "%b %d, %Y"]
+MONTH_FIRST_DATE_FORMATS = ["%m/%d/%Y", "%m-%d-%Y", "%m/%d/%y", "%m-%d-%y", "%d.%m.%Y", "%d %b %Y", "%b %d, %Y"]
+# Rows scanned for a date that settles the day/month order (a first or second number
+# above 12) before the order falls back to the reader's default.
+DATE_ORDER_SCAN_ROWS = 1000
+
+
+class LineSource:
+    """
+    Iterates over the lines of a file as text while keeping track of how many bytes
+    have been read, so progress can be reported without loading the whole file.
+    """
+
+    def __init__(self, path, encoding="utf-8-sig"):
+        self.path = path
+        self.encoding = encoding
+        self.size = os.path.getsize(path)
+        self.bytes_read = 0
+
+    def __iter__(self):
+        with open(self.path, "rb") as f:
+            for raw in f:
+                self.bytes_read += len(raw)
+                yield raw.decode(self.encoding, errors="replace")
+
+
+def normalize_date_ym(date_str, formats=DATE_FORMATS):
+    """
+    Convert a statement date into the "YYYY-MM" key SpentML uses.
+    Handles ISO dates ("2024-03-18", "2024/03/18"), OFX timestamps ("20240318120000[0:GMT]")
+    and the given strptime formats. Returns None if the date cannot be parsed.
+    """
+    date_str = date_str.strip()
+    if len(date_str) >= 7 and date_str[:4].isdigit() and date_str[4] in "-/" and date_str[5:7].isdigit():
+        month = int(date_str[5:7])
+        return f"{date_str[:4]}-{month:02d}" if 1 <= month <= 12 else None
+    if len(date_str) >= 8 and date_str[:8].isdigit():
+        month = int(date_str[4:6])
+        return f"{date_str[:4]}-{month:02d}" if 1 <= month <= 12 else None
+    for fmt in formats:
+        try:
+            return datetime.datetime.strptime(date_str, fmt).strftime("%Y-%m")
+        except ValueError:
+            continue
+    return None
+
+
+def date_order(date_str):
+    """
+    True if a numeric date can only be day first ("25/03/2025"), False if it can only be
+    month first ("03/25/2025"), None if it fits both or is not such a date.
+    """
+    parts = date_str.strip().replace(".", "/").replace("-", "/").split("/")
+    if len(parts) != 3 or not all(part.isdigit() for part in parts) or len(parts[0]) > 2:
+        return None
+    first, second = int(parts[0]), int(parts[1])
+    if first > 12 >= second:
+        return True
+    if second > 12 >= first:
+        return False
+    return None
+
+
+def resolve_dates(rows, day_first=None, default_day_first=True):
+    """
+    Turn (raw date, desc, amount) rows into (date_ym, desc, amount), dropping unparseable ones.
+
+    The day/month order is decided once for the whole column, never per date: day_first
+    if given, otherwise the first date among the leading DATE_ORDER_SCAN_ROWS rows that
+    only fits one order, otherwise default_day_first. Only the scanned rows are buffered.
+    """
+    rows = iter(rows)
+    buffered = []
+    if day_first is None:
+        for row in islice(rows, DATE_ORDER_SCAN_ROWS):
+            buffered.append(row)
+            day_first = date_order(row[0])
+            if day_first is not None:
+                break
+        if day_first is None:
+            day_first = default_day_first
+    formats = DATE_FORMATS if day_first else MONTH_FIRST_DATE_FORMATS
+    for raw_date, desc, amount in chain(buffered, rows):
+        date_ym = normalize_date_ym(raw_date, formats)
+        if date_ym:
+            yield date_ym, desc, amount
+
+
+def parse_amount(amount_str):
+    """Parse amounts such as "1,234.50", "$12.00", "(12.00)" or "-12.00". Returns None if invalid."""
+    amount_str = amount_str.strip().replace(",", "").replace("$", "").replace("£", "").replace("€", "")
+    negative = amount_str.startswith("(") and amount_str.endswith(")")
+    if negative:
+        amount_str = amount_str[1:-1]
+    try:
+        value = float(amount_str)
+    except ValueError:
+        return None
+    return -value if negative else value
+
+
+def _find_column(fieldnames, candidates):
+    lowered = {name.strip().lower(): name for name in fieldnames if name}
+    for candidate in candidates:
+        if candidate in lowered:
+            return lowered[candidate]
+    return None
+
+
+def read_csv_rows(lines, expenses_negative=True, day_first=None):
+    """
+    Yield (date_ym, desc, amount) from CSV lines with a header row.
+
+    Amounts are converted to SpentML's convention (spending positive, income negative).
+    Most banks export spending as negative amounts, so by default the sign is flipped;
+    pass expenses_negative=False for exports that already list spending as positive.
+    Separate debit/credit columns are also understood. Unparseable rows are skipped.
+    day_first sets the order of numeric dates; by default it is detected from the date
+    column (see resolve_dates), falling back to day first.
+    """
+    reader = csv.DictReader(lines)
+    fieldnames = reader.fieldnames or []
+    date_col = _find_column(fieldnames, CSV_DATE_COLUMNS)
+    desc_col = _find_column(fieldnames, CSV_DESC_COLUMNS)
+    amount_col = _find_column(fieldnames, CSV_AMOUNT_COLUMNS)
+    debit_col = _find_column(fieldnames, CSV_DEBIT_COLUMNS)
+    credit_col = _find_column(fieldnames, CSV_CREDIT_COLUMNS)
+    if not date_col or not desc_col or not (amount_col or debit_col or credit_col):
+        raise ValueError(f"Unrecognised CSV header: {fieldnames}")
+
+    return resolve_dates(_csv_raw_rows(reader, date_col, desc_col, amount_col, debit_col, credit_col,
+                                       expenses_negative), day_first)
+
+
+def _csv_raw_rows(reader, date_col, desc_col, amount_col, debit_col, credit_col, expenses_negative):
+    for row in reader:
+        raw_date = row.get(date_col) or ""
+        desc = (row.get(desc_col) or "").strip()
+        if amount_col:
+            amount = parse_amount(row.get(amount_col) or "")
+            if amount is not None and expenses_negative:
+                amount = -amount
+        else:
+            debit = parse_amount(row.get(debit_col) or "0") if debit_col else 0.0
+            credit = parse_amount(row.get(credit_col) or "0") if credit_col else 0.0
+            amount = None if debit is None or credit is None else abs(debit) - abs(credit)
+        if raw_date and desc and amount is not None:
+            yield raw_date, desc, amount
+
+
+def read_ofx_rows(lines):
+    """
+    Yield (date_ym, desc, amount) from the <STMTTRN> blocks of an OFX file.
+    Works for both the SGML (unclosed tags) and XML flavours, one line at a time.
+    OFX amounts are negative for spending, so the sign is flipped.
+    """
+    current = None
+    for line in lines:
+        # A line can hold a single tag (SGML) or a whole block (XML written on one line).
+        for piece in line.split("<")[1:]:
+            tag, _, value = piece.partition(">")
+            tag = tag.strip().upper()
+            value = value.strip()
+            if tag == "STMTTRN":
+                current = {}
+            elif tag == "/STMTTRN" and current is not None:
+                date_ym = normalize_date_ym(current.get("DTPOSTED", ""))
+                desc = current.get("NAME") or current.get("MEMO") or current.get("PAYEE", "")
+                amount = parse_amount(current.get("TRNAMT", ""))
+                if date_ym and desc and amount is not None:
+                    yield date_ym, desc, -amount
+                current = None
+            elif current is not None and value:
+                current[tag] = value
+
+
+def read_qif_rows(lines, day_first=None):
+    """
+    Yield (date_ym, desc, amount) from a QIF file. Records are separated by "^";
+    D is the date, T the amount (negative for spending), P the payee and M the memo.
+    The date order is detected like for CSV, but falls back to month first, as QIF
+    files mostly come from US software.
+    """
+    return resolve_dates(_qif_raw_rows(lines), day_first, default_day_first=False)
+
+
+def _qif_raw_rows(lines):
+    current = {}
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line or line.startswith("!"):
+            continue
+        code, value = line[0], line[1:].strip()
+        if code == "^":
+            raw_date = current.get("D", "").replace("'", "/")
+            desc = current.get("P") or current.get("M", "")
+            amount = parse_amount(current.get("T", current.get("U", "")))
+            if raw_date and desc and amount is not None:
+                yield raw_date, desc, -amount
+            current = {}
+        else:
+            current[code] = value
+
+
+READERS = {
+    "csv": read_csv_rows,
+    "ofx": read_ofx_rows,
+    "qfx": read_ofx_rows,
+    "qif": read_qif_rows,
+}
+
+
+def chunked(rows, size):
+    """Group an iterable into lists of at most `size` items without materialising it."""
+    it = iter(rows)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_import(engine, path, fmt=None, chunk_size=CHUNK_SIZE):
+    """
+    Stream a statement into engine.add_transactions_bulk one chunk at a time.
+
+    Yields (rows_imported, bytes_read, total_bytes) after every chunk, so callers can show
+    progress or spread the import over several UI frames. Only one chunk is ever in memory.
+    """
+    fmt = (fmt or os.path.splitext(path)[1].lstrip(".")).lower()
+    if fmt not in READERS:
+        raise ValueError(f"Unsupported statement format: {fmt}")
+    source = LineSource(path)
+    imported = 0
+    for chunk in chunked(READERS[fmt](source), chunk_size):
+        engine.add_transactions_bulk(chunk)
+        imported += len(chunk)
+        yield imported, source.bytes_read, source.size
+
+
+def import_statement(engine, path, fmt=None, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Import a whole CSV/OFX/QIF statement. progress, if given, is called as
+    progress(rows_imported, bytes_read, total_bytes) after each chunk.
+    Returns the number of rows imported.
+    """
+    imported = 0
+    for imported, bytes_read, total_bytes in iter_import(engine, path, fmt, chunk_size):
+        if progress:
+            progress(imported, bytes_read, total_bytes)
+    return imported
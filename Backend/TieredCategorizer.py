@@ -0,0 +1,121 @@
+import re
+
+from Backend.KeywordMatcher import KeywordMap, KeywordMatcher
+from Backend.SpendingInsights import DEFAULT_KEYWORD_MAP
+
+# Confidence reported for a description the user (or the training data) labelled before.
+EXACT_CONFIDENCE = 1.0
+# Confidence of a keyword nobody has corrected yet. Each keyword's confidence is its
+# precision over the corrections of descriptions it matched, smoothed towards this value
+# as if it had KEYWORD_PRIOR_WEIGHT confirmations at this rate.
+KEYWORD_CONFIDENCE = 0.9
+KEYWORD_PRIOR_WEIGHT = 5
+
+TIERS = ("exact", "keyword", "model")
+
+# Anything that is not a letter or digit separates tokens for the keyword tier.
+_TOKEN_SEPARATORS = re.compile(r"[\W_]+")
+
+
+def _tokens(text):
+    """Text as space-separated lower-case tokens, padded with a space on both sides."""
+    return " " + " ".join(_TOKEN_SEPARATORS.sub(" ", text.lower()).split()) + " "
+
+
+class TieredCategorizer:
+    """
+    The rule tiers in front of SpentML's Naive Bayes model, plus per-tier hit counters.
+
+      1. exact   - the description (normalized) was labelled before, in a training sample
+                   or a correction: its latest label is used.
+      2. keyword - a known keyword occurs in it as whole tokens ("rent" matches "rent may"
+                   but not "parents gift"; Aho-Corasick scan, see KeywordMatcher). Its
+                   confidence starts at KEYWORD_CONFIDENCE and follows how often the user
+                   keeps or corrects the category of descriptions the keyword matched.
+      3. model   - SpentML asks the classifier for descriptions neither rule knows.
+
+    Keyword categories take the spelling the samples already use for the same name in
+    another case, and are lower-cased otherwise, like the rest of SpentML's categories.
+
+    The keyword feedback is kept in memory, like SpentML's review queue.
+
+    record() counts where every answer came from and how many fell below the confidence
+    threshold; stats() reports the hit rate of each tier.
+    """
+
+    def __init__(self, keyword_map=None):
+        self.exact = {}         # normalized description -> category
+        self._canonical = {}    # lower-cased category -> spelling used by the samples
+        self.keyword_map = KeywordMap(DEFAULT_KEYWORD_MAP if keyword_map is None else keyword_map)
+        self._matcher = None
+        self._matcher_version = None
+        self._padded = {}       # padded, tokenized keyword -> keyword_map key
+        self.keyword_feedback = {}  # keyword -> [corrections keeping its category, corrections changing it]
+        self.counts = dict.fromkeys(TIERS, 0)
+        self.low_confidence = 0
+
+    def learn(self, key, cat):
+        """Remember a confirmed label for a normalized description."""
+        self.exact[key] = cat
+        self._canonical.setdefault(cat.lower(), cat)
+
+    def _keyword_matcher(self):
+        if self._matcher is None or self._matcher_version != self.keyword_map.version:
+            self._padded = {}
+            for keyword in self.keyword_map:
+                self._padded.setdefault(_tokens(keyword), keyword)
+            self._matcher = KeywordMatcher(self._padded)
+            self._matcher_version = self.keyword_map.version
+        return self._matcher
+
+    def lookup_exact(self, key):
+        """The latest label of a normalized description, or None."""
+        return self.exact.get(key)
+
+    def _match_keyword(self, key):
+        padded = self._keyword_matcher().first_match(_tokens(key))
+        return self._padded[padded] if padded is not None else None
+
+    def _keyword_category(self, keyword):
+        cat = self.keyword_map[keyword]
+        return self._canonical.get(cat.lower(), cat.lower())
+
+    def keyword_confidence(self, keyword):
+        kept, changed = self.keyword_feedback.get(keyword, (0, 0))
+        return (kept + KEYWORD_CONFIDENCE * KEYWORD_PRIOR_WEIGHT) / (kept + changed + KEYWORD_PRIOR_WEIGHT)
+
+    def lookup_keyword(self, key):
+        """
+        (category, confidence) of the first keyword found as whole tokens in a normalized
+        description, or None.
+        """
+        keyword = self._match_keyword(key)
+        if keyword is None:
+            return None
+        return self._keyword_category(keyword), self.keyword_confidence(keyword)
+
+    def correct(self, key, cat):
+        """
+        Record the user's category for a normalized description: if a keyword matches it,
+        the correction confirms or contradicts that keyword. Call before learn().
+        """
+        keyword = self._match_keyword(key)
+        if keyword is None:
+            return
+        feedback = self.keyword_feedback.setdefault(keyword, [0, 0])
+        feedback[0 if cat.lower() == self._keyword_category(keyword).lower() else 1] += 1
+
+    def record(self, tier, confidence, threshold):
+        self.counts[tier] += 1
+        if confidence < threshold:
+            self.low_confidence += 1
+
+    def stats(self):
+        """Lookups per tier, the share of each tier and the number of low-confidence answers."""
+        total = sum(self.counts.values())
+        return {
+            "lookups": total,
+            "tiers": dict(self.counts),
+            "hit_rates": {tier: (n / total if total else 0.0) for tier, n in self.counts.items()},
+            "low_confidence": self.low_confidence,
+        }
@@ -0,0 +1,160 @@
+from collections import defaultdict
+
+import numpy as np
+
+from Backend.MonthIndex import index_to_ym, ym_to_index
+
+# Rows allocated up front; the columns double in size whenever they fill up.
+INITIAL_CAPACITY = 1024
+
+
+class Codes:
+    """Dictionary encoding: each distinct value gets a small int code, in order of first use."""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def get(self, value):
+        """Code of an already-seen value, or None."""
+        return self.codes.get(value)
+
+    def __len__(self):
+        return len(self.values)
+
+
+class TransactionStore:
+    """
+    Columnar storage for SpentML's transactions.
+
+    Instead of one dict per row, every field is a NumPy column: amount as float64, month
+    as int32 (months since 1970-01, see Backend/MonthIndex.py) and user, category and
+    description as int32 codes into per-store dictionaries, so repeated strings are only
+    kept once.
+
+    It behaves like the list of dicts it replaces: len(), iteration and store[pos] give
+    {"date_ym", "desc", "amount", "category", "user"} dicts (built on the fly, so changing
+    them does not change the store; use set_category()), and append()/extend() take them.
+    Totals are computed with vectorized group-bys over the columns.
+    """
+
+    def __init__(self, rows=()):
+        self._size = 0
+        self.amount = np.empty(INITIAL_CAPACITY, dtype=np.float64)
+        self.month = np.empty(INITIAL_CAPACITY, dtype=np.int32)
+        self.user = np.empty(INITIAL_CAPACITY, dtype=np.int32)
+        self.category = np.empty(INITIAL_CAPACITY, dtype=np.int32)
+        self.desc = np.empty(INITIAL_CAPACITY, dtype=np.int32)
+        self.users = Codes()
+        self.categories = Codes()
+        self.descs = Codes()
+        self.extend(rows)
+
+    # -------------------------
+    # List interface
+    # -------------------------
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, pos):
+        if pos < 0:
+            pos += self._size
+        if not 0 <= pos < self._size:
+            raise IndexError("transaction index out of range")
+        return {
+            "date_ym": index_to_ym(self.month[pos]),
+            "desc": self.descs.values[self.desc[pos]],
+            "amount": float(self.amount[pos]),
+            "category": self.categories.values[self.category[pos]],
+            "user": self.users.values[self.user[pos]]
+        }
+
+    def __iter__(self):
+        for pos in range(self._size):
+            yield self[pos]
+
+    def append(self, t):
+        pos = self._size
+        self._reserve(pos + 1)
+        self.amount[pos] = t["amount"]
+        self.month[pos] = ym_to_index(t["date_ym"])
+        self.user[pos] = self.users.encode(t.get("user"))
+        self.category[pos] = self.categories.encode(t["category"])
+        self.desc[pos] = self.descs.encode(t["desc"])
+        self._size = pos + 1
+
+    def extend(self, rows):
+        """Append transaction dicts, encoding them into temporary lists and copying once."""
+        amounts, months, users, categories, descs = [], [], [], [], []
+        for t in rows:
+            amounts.append(t["amount"])
+            months.append(ym_to_index(t["date_ym"]))
+            users.append(self.users.encode(t.get("user")))
+            categories.append(self.categories.encode(t["category"]))
+            descs.append(self.descs.encode(t["desc"]))
+        start = self._size
+        end = start + len(amounts)
+        if end == start:
+            return
+        self._reserve(end)
+        self.amount[start:end] = amounts
+        self.month[start:end] = months
+        self.user[start:end] = users
+        self.category[start:end] = categories
+        self.desc[start:end] = descs
+        self._size = end
+
+    def _reserve(self, size):
+        capacity = len(self.amount)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name in ("amount", "month", "user", "category", "desc"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+
+    def set_category(self, pos, category):
+        self.category[pos] = self.categories.encode(category)
+
+    # -------------------------
+    # Aggregation
+    # -------------------------
+    def user_mask(self, user):
+        """Boolean mask of one user's rows (None selects the anonymous ones)."""
+        code = self.users.get(user)
+        if code is None:
+            return np.zeros(self._size, dtype=bool)
+        return self.user[:self._size] == code
+
+    def month_category_totals(self, mask=None):
+        """
+        Sum the amounts per (month, category) with a single bincount and return
+        {"YYYY-MM": {category: total}}. mask (e.g. user_mask(...)) restricts the rows.
+        """
+        month = self.month[:self._size]
+        category = self.category[:self._size]
+        amount = self.amount[:self._size]
+        if mask is not None:
+            month, category, amount = month[mask], category[mask], amount[mask]
+        totals = defaultdict(dict)
+        if not len(month):
+            return totals
+        first = int(month.min())
+        n_categories = len(self.categories)
+        keys = (month - first).astype(np.int64) * n_categories + category
+        sums = np.bincount(keys, weights=amount)
+        present = np.bincount(keys).nonzero()[0]
+        for key in present.tolist():
+            month_offset, cat = divmod(key, n_categories)
+            totals[index_to_ym(first + month_offset)][self.categories.values[cat]] = float(sums[key])
+        return totals
@@ -4,8 +4,12 @@ from kivymd.uix.label import MDLabel
 from kivymd.uix.button import MDRaisedButton
 from kivy.metrics import dp
 from kivy.clock import Clock
+from kivy.uix.scrollview import ScrollView
 
 from Components.MenuBar import MenuBar
+from Backend.SpentML import get_engine
+from Backend.Forecast import forecast_spending
+from utils.session import get_user
 
 class ForecastScreen(MDScreen):
     def __init__(self, **kwargs):
@@ -34,11 +38,22 @@ class ForecastScreen(MDScreen):
 
         # Info label
         self.info_label = MDLabel(
-            text="Forecasted budget, recommendations, and goal tracking here.",
+            text="Forecasted spending per category for the next months.",
             font_style="Body1",
             halign="center"
         )
 
+        # Forecast table (one line per category), scrollable
+        self.forecast_scroll = ScrollView(size_hint=(1, 1))
+        self.forecast_label = MDLabel(
+            text="",
+            font_style="Body2",
+            halign="left",
+            size_hint_y=None
+        )
+        self.forecast_label.bind(texture_size=lambda label, size: setattr(label, 'height', size[1]))
+        self.forecast_scroll.add_widget(self.forecast_label)
+
         # Button to go to Insights
         self.btn_to_insights = MDRaisedButton(
             text="Go to Insights",
@@ -52,6 +67,7 @@ class ForecastScreen(MDScreen):
         # Add them to layout
         self.layout.add_widget(self.title_label)
         self.layout.add_widget(self.info_label)
+        self.layout.add_widget(self.forecast_scroll)
         self.layout.add_widget(self.btn_to_insights)
 
         # Put layout into root_layout
@@ -70,5 +86,24 @@ class ForecastScreen(MDScreen):
         self.root_layout.add_widget(menu)
         self.root_layout.add_widget(self.layout)
 
+    def on_pre_enter(self):
+        # Cached per user and data version, so re-entering without new data costs nothing.
+        result = forecast_spending(get_engine(get_user()))
+        if not result["forecasts"]:
+            self.info_label.text = "No spending recorded yet - add transactions in Insights first."
+            self.forecast_label.text = ""
+            return
+        self.info_label.text = f"Forecast for {', '.join(result['months'])} ({result['method']})"
+        lines = []
+        totals = [0.0] * len(result["months"])
+        for cat, values in sorted(result["forecasts"].items()):
+            lines.append(f"{cat}: " + " | ".join(f"${v:.2f}" for v in values))
+            totals = [t + v for t, v in zip(totals, values)]
+        lines.append("Total: " + " | ".join(f"${t:.2f}" for t in totals))
+        # Income is forecast as negative spending; shown on its own, as positive amounts.
+        for cat, values in sorted(result["income"].items()):
+            lines.append(f"Income ({cat}): " + " | ".join(f"${-v:.2f}" for v in values))
+        self.forecast_label.text = "\n".join(lines)
+
     def go_to_insights(self, instance):
         self.manager.current = 'insights'
@@ -7,34 +7,30 @@ from kivymd.uix.textfield import MDTextField
 from kivy.metrics import dp
 from kivy.clock import Clock
 from kivy.uix.scrollview import ScrollView
-import json
+import csv
 import os
 
 # Use the custom calendar popup instead of MDDatePicker
 from Components.CustomCalendarPopup import CustomCalendarPopup
 
 # For the charts (graph size updated in ChartUtils)
-from utils.ChartUtils import create_category_bar, create_category_pie
+from utils.ChartUtils import render_chart_async, cancel_chart_render
 
 # Our ML backend – note we pass a username here for user-specific data.
-from Backend.SpentML import SpentML
+from Backend.SpentML import CONFIDENCE_THRESHOLD, get_engine
+from Backend.StatementImporter import iter_import
 
 from Components.MenuBar import MenuBar
+from utils.session import get_user
 
-
-# Helper function to load users (which may include recurring subscriptions and recurring income)
-def load_users():
-    USERS_FILE = 'users.json'
-    if not os.path.exists(USERS_FILE):
-        return {}
-    with open(USERS_FILE, 'r') as f:
-        return json.load(f)
+# Cached users.json (may include recurring subscriptions and recurring income)
+from utils.AccountManager import load_users
 
 
 class InsightsScreen(MDScreen):
     def reset(self):
         """
-        Clear UI elements and reinitialize the ML engine (with username cleared).
+        Clear UI elements and unbind the shared ML engine from the user.
         Call this on logout.
         """
         self.date_str = ""
@@ -43,6 +39,9 @@ class InsightsScreen(MDScreen):
         self.amt_input.text = ""
         self.income_source_input.text = ""
         self.income_amount_input.text = ""
+        self.import_path_input.text = ""
+        self.import_btn.disabled = False
+        self._import_steps = None
         self.status_label.text = ""
         self.corr_desc_input.text = ""
         self.corr_cat_input.text = ""
@@ -50,18 +49,21 @@ class InsightsScreen(MDScreen):
         self.m1_input.text = ""
         self.m2_input.text = ""
         self.compare_label.text = ""
+        cancel_chart_render()
         self.chart_box.clear_widgets()
         self.chart_month_input.text = ""
         self.total_spent_label.text = "Total Spent: $0.00"
         self.total_income_label.text = "Total Income: $0.00"
-        # Reinitialize ML engine without a user (or later with a new username)
-        self.ml_engine = SpentML(username=None)
+        # Unbind the shared ML engine from the user (login binds it to the next one)
+        self.ml_engine.bind_user(None)
 
     def __init__(self, username=None, **kwargs):
         super(InsightsScreen, self).__init__(**kwargs)
-        # Initialize the ML engine with the given username so that spending/income is user-specific.
-        self.ml_engine = SpentML(username=username)
+        # Bind the shared ML engine to the given username so that spending/income is user-specific.
+        # The screen is built lazily, so by default it belongs to whoever is logged in.
+        self.ml_engine = get_engine(username if username is not None else get_user())
         self.date_str = ""  # Holds the selected date
+        self._import_steps = None  # Generator of the statement import in progress
 
         # Root layout for MenuBar and content
         self.root_layout = MDBoxLayout(
@@ -162,6 +164,29 @@ class InsightsScreen(MDScreen):
         self.income_row.add_widget(self.add_income_btn)
         self.layout.add_widget(self.income_row)
 
+        # --- Statement Import Row ---
+        self.import_row = MDBoxLayout(
+            orientation='horizontal',
+            spacing=dp(10),
+            size_hint=(1, None),
+            height=dp(48)
+        )
+        self.import_path_input = MDTextField(
+            hint_text="Bank statement file (.csv, .ofx, .qif)",
+            size_hint=(0.6, None),
+            height=dp(48)
+        )
+        self.import_btn = MDRaisedButton(
+            text="Import Statement",
+            on_release=self.import_statement,
+            size_hint=(None, None),
+            width=dp(120),
+            height=dp(48)
+        )
+        self.import_row.add_widget(self.import_path_input)
+        self.import_row.add_widget(self.import_btn)
+        self.layout.add_widget(self.import_row)
+
         # --- Status Label ---
         self.status_label = MDLabel(
             text="",
@@ -354,8 +379,10 @@ class InsightsScreen(MDScreen):
             self.status_label.text = "Amount must be a number."
             return
         ym = self.date_str[:7]
-        self.ml_engine.add_transaction(ym, desc, amt)
-        self.status_label.text = f"Added: {desc} -> {amt} (predicted cat)."
+        cat, confidence = self.ml_engine.add_transaction(ym, desc, amt)
+        self.status_label.text = f"Added: {desc} -> {amt} ({cat})."
+        if confidence < CONFIDENCE_THRESHOLD:
+            self.status_label.text += " Not sure about the category, correct it below if needed."
         self.desc_input.text = ""
         self.amt_input.text = ""
 
@@ -383,6 +410,43 @@ class InsightsScreen(MDScreen):
         self.income_source_input.text = ""
         self.income_amount_input.text = ""
 
+    # -------------------------
+    # Import Bank Statement
+    # -------------------------
+    def import_statement(self, instance):
+        path = self.import_path_input.text.strip()
+        if not path or not os.path.exists(path):
+            self.status_label.text = "Enter the path of a statement file."
+            return
+        # The import runs one chunk per frame so the UI stays responsive and can show progress.
+        self._import_steps = iter_import(self.ml_engine, path)
+        self.import_btn.disabled = True
+        self.status_label.text = "Importing..."
+        Clock.schedule_once(self._import_next_chunk, 0)
+
+    def _import_next_chunk(self, dt):
+        if self._import_steps is None:
+            return
+        try:
+            imported, bytes_read, total_bytes = next(self._import_steps)
+        except StopIteration:
+            self._import_steps = None
+            self.import_btn.disabled = False
+            self.import_path_input.text = ""
+            self.status_label.text = "Statement imported."
+            pending = len(self.ml_engine.pending_reviews())
+            if pending:
+                self.status_label.text += f" {pending} transactions need a category check."
+            return
+        except (ValueError, OSError, csv.Error) as e:
+            self._import_steps = None
+            self.import_btn.disabled = False
+            self.status_label.text = f"Import failed: {e}"
+            return
+        percent = 100 * bytes_read / total_bytes if total_bytes else 100
+        self.status_label.text = f"Importing... {imported} rows ({percent:.0f}%)"
+        Clock.schedule_once(self._import_next_chunk, 0)
+
     # -------------------------
     # Correct Category
     # -------------------------
@@ -406,8 +470,18 @@ class InsightsScreen(MDScreen):
         if not m1 or not m2:
             self.compare_label.text = "Enter two months (YYYY-MM)."
             return
-        msg = self.ml_engine.compare_months(m1, m2)
-        self.compare_label.text = msg
+        try:
+            result = self.ml_engine.compare_months(m1, m2)
+        except ValueError:
+            self.compare_label.text = "Months must be in YYYY-MM format."
+            return
+        text = result['top_change_summary']
+        # Show the monthly totals in between as well, unless the range is too long for the label.
+        start, end = sorted([m1, m2])
+        trend = self.ml_engine.spending_trend(start, end)
+        if 1 < len(trend) <= 12:
+            text += "\nTotal spent: " + ", ".join(f"{ym} ${total:.2f}" for ym, total in trend)
+        self.compare_label.text = text
 
     # -------------------------
     # Helper: Filter Spending Data and Include Recurring Items
@@ -468,33 +542,33 @@ class InsightsScreen(MDScreen):
         self.chart_box.clear_widgets()
         m = self.chart_month_input.text.strip()
         if not m:
+            # A render still in flight for the previous month must not repopulate the box.
+            cancel_chart_render()
             return
-        if self.ml_engine.username:
-            cat_dict = self.ml_engine.user_spending[self.ml_engine.username].get(m, {})
-        else:
-            cat_dict = self.ml_engine.monthly_spend.get(m, {})
+        cat_dict = self.ml_engine.month_spending(m)
         filtered_data, total_spent, total_income = self._filter_spending_data(cat_dict)
         self.total_spent_label.text = f"Total Spent: ${total_spent:.2f}"
         self.total_income_label.text = f"Total Income: ${total_income:.2f}"
-        bar_texture = create_category_bar(filtered_data)
-        bar_image = Image(texture=bar_texture, size_hint=(1, 1))
-        self.chart_box.add_widget(bar_image)
+        # Rendered off the UI thread; the texture arrives in show_chart_texture.
+        render_chart_async('bar', filtered_data, self.show_chart_texture)
 
     def show_pie_chart(self, instance):
         self.chart_box.clear_widgets()
         m = self.chart_month_input.text.strip()
         if not m:
+            # A render still in flight for the previous month must not repopulate the box.
+            cancel_chart_render()
             return
-        if self.ml_engine.username:
-            cat_dict = self.ml_engine.user_spending[self.ml_engine.username].get(m, {})
-        else:
-            cat_dict = self.ml_engine.monthly_spend.get(m, {})
+        cat_dict = self.ml_engine.month_spending(m)
         filtered_data, total_spent, total_income = self._filter_spending_data(cat_dict)
         self.total_spent_label.text = f"Total Spent: ${total_spent:.2f}"
         self.total_income_label.text = f"Total Income: ${total_income:.2f}"
-        pie_texture = create_category_pie(filtered_data)
-        pie_widget = Image(texture=pie_texture, size_hint=(1, 1))
-        self.chart_box.add_widget(pie_widget)
+        render_chart_async('pie', filtered_data, self.show_chart_texture)
+
+    def show_chart_texture(self, texture):
+        self.chart_box.clear_widgets()
+        chart_image = Image(texture=texture, size_hint=(1, 1))
+        self.chart_box.add_widget(chart_image)
 
     def go_to_forecasting(self, instance):
         self.manager.current = 'forecast'
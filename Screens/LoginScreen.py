@@ -1,11 +1,9 @@
 from kivy.lang import Builder
 from kivymd.uix.screen import MDScreen
 
-from Backend.SpentML import SpentML
 from utils.AccountManager import authenticate
 from utils.session import set_user
 from kivy.utils import platform
-from Screens.InsightsScreen import InsightsScreen
 
 
 class LoginScreen(MDScreen):
@@ -18,10 +16,13 @@ class LoginScreen(MDScreen):
             set_user(username)
             self.ids.username.text = ''
             self.ids.password.text = ''
-            # Get the insights screen from the ScreenManager
-            insights_screen = self.manager.get_screen("insights")
-            # Update the insights screen with the current username.
-            insights_screen.ml_engine = SpentML(username=username)
+            # If the insights screen was already built, rebind its (shared) engine to the current
+            # username; nothing is reloaded from disk. Otherwise it picks the user up from the
+            # session when it is first opened, so the ML backend (and scikit-learn) is not loaded
+            # just to log in.
+            if self.manager.has_screen("insights"):
+                insights_screen = self.manager.get_screen("insights")
+                insights_screen.ml_engine.bind_user(username)
             # Optionally, if you have a reset() or set_username() method, call that:
             # insights_screen.set_username(username)
             # Switch to the appropriate screen (for desktop "pc", for mobile "phone")
@@ -0,0 +1,45 @@
+"""
+Throughput of SpentML.add_transactions_bulk against calling add_transaction in a loop.
+
+Run from the repository root:
+    python -m benchmarks.bench_bulk_ingest [n_rows]
+
+Both runs work on a fresh copy of the data files in a temporary directory, so the
+real spent_ml_data.json is never touched.
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import fresh_engine, make_rows
+
+
+def run(n):
+    rows = make_rows(n)
+    results = {}
+    cwd = os.getcwd()
+    for name in ("loop", "bulk"):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                engine = fresh_engine()
+                start = time.perf_counter()
+                if name == "loop":
+                    for date_ym, desc, amount in rows:
+                        engine.add_transaction(date_ym, desc, amount)
+                else:
+                    engine.add_transactions_bulk(rows)
+                elapsed = time.perf_counter() - start
+            finally:
+                os.chdir(cwd)
+        results[name] = n / elapsed
+    return results
+
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    results = run(n_rows)
+    for name, rate in results.items():
+        print(f"{name:>5}: {rate:12.0f} rows/s")
+    print(f"speedup: {results['bulk'] / results['loop']:.1f}x")
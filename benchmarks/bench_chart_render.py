@@ -0,0 +1,68 @@
+"""
+Milliseconds per chart for the chart rendering paths in ChartUtils.
+
+Run from the repository root (no window is opened):
+    python -m benchmarks.bench_chart_render [repeats]
+
+  png    - new figure every time, PNG encode + decode back to RGBA pixels with Pillow
+           (what Kivy's CoreImage does).
+  rgba   - new figure every time, draw + take the raw canvas buffer.
+  pooled - the pooled ChartFigure redrawn with the same categories (values change),
+           so bars/wedges are updated in place, + raw canvas buffer.
+
+Uploading the pixels to a GL texture costs the same for every path and needs a window,
+so it is left out.
+"""
+import sys
+import time
+
+from PIL import Image as PILImage
+
+from utils.ChartUtils import ChartFigure, figure_to_png, figure_to_rgba, render_chart
+
+SAMPLE_DATA = {
+    "Groceries": 412.5, "Dining": 180.0, "Housing": 1200.0, "Utilities": 140.2,
+    "Entertainment": 75.0, "Transport": 96.4, "Clothing": 60.0, "Health": 45.0,
+}
+
+
+def png_pixels(fig):
+    image = PILImage.open(figure_to_png(fig))
+    return image.convert("RGBA").tobytes()
+
+
+def rgba_pixels(fig):
+    width, height, rgba = figure_to_rgba(fig)
+    return len(rgba)
+
+
+def sample(i):
+    # Same categories every time, slightly different amounts (like a month being edited).
+    return {cat: value + i for cat, value in SAMPLE_DATA.items()}
+
+
+def time_path(render, repeats):
+    render(0)  # warm-up (font cache, etc.)
+    start = time.perf_counter()
+    for i in range(1, repeats + 1):
+        render(i)
+    return (time.perf_counter() - start) * 1000 / repeats
+
+
+def run(repeats):
+    results = {}
+    for kind in ("bar", "pie"):
+        paths = {
+            "png": lambda i: png_pixels(ChartFigure(kind).draw(sample(i))),
+            "rgba": lambda i: rgba_pixels(ChartFigure(kind).draw(sample(i))),
+            "pooled": lambda i: render_chart(kind, sample(i), rgba_pixels),
+        }
+        for mode, render in paths.items():
+            results[f"{kind}/{mode}"] = time_path(render, repeats)
+    return results
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for name, ms in run(n).items():
+        print(f"{name:>10}: {ms:8.1f} ms/chart")
@@ -0,0 +1,83 @@
+"""
+SpendingInsights.categorize_transaction with the keyword automaton against the old loop
+that tests every keyword with `in`, for a large keyword map.
+
+Run from the repository root:
+    python -m benchmarks.bench_keyword_matcher [n_keywords] [n_descriptions]
+
+Both approaches are checked to pick the same category for every description.
+"""
+import random
+import string
+import sys
+import time
+
+from Backend.SpendingInsights import SpendingInsights
+
+CATEGORIES = ["Groceries", "Dining", "Housing", "Utilities", "Entertainment", "Transport", "Clothing", "Health"]
+
+
+def random_word(rng, low=4, high=10):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(low, high)))
+
+
+def make_keyword_map(n, rng):
+    keyword_map = {}
+    while len(keyword_map) < n:
+        keyword_map[random_word(rng)] = rng.choice(CATEGORIES)
+    return keyword_map
+
+
+def make_descriptions(n, keywords, rng):
+    # Roughly half of the descriptions contain a known keyword somewhere.
+    descriptions = []
+    for _ in range(n):
+        words = [random_word(rng, 3, 8) for _ in range(rng.randint(2, 5))]
+        if rng.random() < 0.5:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(keywords))
+        descriptions.append(" ".join(words).upper())
+    return descriptions
+
+
+def linear_scan(keyword_map, description):
+    desc_lower = description.lower()
+    for kw, cat in keyword_map.items():
+        if kw in desc_lower:
+            return cat
+    return "Misc"
+
+
+def run(n_keywords, n_descriptions, seed=0):
+    rng = random.Random(seed)
+    insights = SpendingInsights()
+    insights.keyword_map = make_keyword_map(n_keywords, rng)
+    descriptions = make_descriptions(n_descriptions, list(insights.keyword_map), rng)
+
+    start = time.perf_counter()
+    insights.categorize_transaction("warm up")  # compiles the automaton
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    fast = [insights.categorize_transaction(d) for d in descriptions]
+    automaton_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    slow = [linear_scan(insights.keyword_map, d) for d in descriptions]
+    linear_s = time.perf_counter() - start
+
+    assert fast == slow, "automaton and linear scan disagree"
+    return {
+        "build_ms": build_ms,
+        "automaton_per_s": n_descriptions / automaton_s,
+        "linear_per_s": n_descriptions / linear_s,
+    }
+
+
+if __name__ == "__main__":
+    n_kw = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    n_desc = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    results = run(n_kw, n_desc)
+    print(f"keywords: {n_kw}, automaton built in {results['build_ms']:.1f} ms")
+    print(f"automaton: {results['automaton_per_s']:12.0f} descriptions/s")
+    print(f"   linear: {results['linear_per_s']:12.0f} descriptions/s")
+    print(f"speedup: {results['automaton_per_s'] / results['linear_per_s']:.1f}x")
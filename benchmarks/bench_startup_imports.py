@@ -0,0 +1,55 @@
+"""
+Import cost of the app's startup path, measured with `python -X importtime`.
+
+Run from the repository root:
+    python -m benchmarks.bench_startup_imports [module ...]
+
+Each module is imported in a fresh interpreter. For each one the total cumulative
+import time is printed, along with whether scikit-learn and matplotlib were pulled in
+(they should not be for App.main / Screens.LoginScreen, which is all the login
+screen needs now that the other screens are built lazily).
+"""
+import os
+import subprocess
+import sys
+
+DEFAULT_MODULES = ["App.main", "Screens.LoginScreen", "Screens.InsightsScreen", "Backend.SpentML", "utils.ChartUtils"]
+HEAVY_PACKAGES = ["sklearn", "matplotlib"]
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module):
+    """Return ({module name: cumulative us}, total us) for importing `module`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+    modules = {}
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented by two spaces per level, after the single separator space.
+        if not name[1:].startswith(" "):
+            total += int(cumulative)
+        modules[name.strip()] = int(cumulative)
+    return modules, total
+
+
+def run(modules):
+    results = {}
+    for module in modules:
+        times, total = import_times(module)
+        results[module] = {
+            "total_ms": total / 1000,
+            "heavy": {pkg: times[pkg] / 1000 for pkg in HEAVY_PACKAGES if pkg in times},
+        }
+    return results
+
+
+if __name__ == "__main__":
+    for module, result in run(sys.argv[1:] or DEFAULT_MODULES).items():
+        heavy = ", ".join(f"{pkg} {ms:.0f} ms" for pkg, ms in result["heavy"].items()) or "none"
+        print(f"{module:>24}: {result['total_ms']:8.1f} ms   heavy imports: {heavy}")
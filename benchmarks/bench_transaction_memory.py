@@ -0,0 +1,81 @@
+"""
+Memory per transaction of SpentML's columnar TransactionStore against the list of dicts
+it replaced, plus the time to total spending per (month, category).
+
+Run from the repository root:
+    python -m benchmarks.bench_transaction_memory [n_rows]
+
+Memory is measured with tracemalloc (everything allocated while building each container,
+strings included), so the numbers are comparable between the two layouts.
+"""
+import random
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+from Backend.TransactionStore import TransactionStore
+
+DESCRIPTIONS = [
+    "groceries", "supermarket run", "netflix", "coffee at cafe", "rent", "electricity bill",
+    "gaming chair", "bus ticket", "restaurant dinner", "new shoes", "water bill", "gym membership",
+]
+CATEGORIES = ["groceries", "entertainment", "dining", "housing", "utilities", "transport", "clothing", "health"]
+USERS = [None, "alice", "bob"]
+
+
+def make_rows(n, seed=0):
+    # Descriptions are copied per row, like strings parsed out of a JSON file.
+    rng = random.Random(seed)
+    return [
+        {
+            "date_ym": f"{rng.randint(2015, 2024)}-{rng.randint(1, 12):02d}",
+            "desc": "".join(rng.choice(DESCRIPTIONS)),
+            "amount": round(rng.uniform(1, 200), 2),
+            "category": rng.choice(CATEGORIES),
+            "user": rng.choice(USERS),
+        }
+        for _ in range(n)
+    ]
+
+
+def measure(build):
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def dict_totals(rows):
+    totals = defaultdict(lambda: defaultdict(float))
+    for t in rows:
+        totals[t["date_ym"]][t["category"]] += t["amount"]
+    return totals
+
+
+def run(n):
+    rows, dict_bytes = measure(lambda: make_rows(n))
+    store, store_bytes = measure(lambda: TransactionStore(rows))
+
+    start = time.perf_counter()
+    expected = dict_totals(rows)
+    dict_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    totals = store.month_category_totals()
+    store_ms = (time.perf_counter() - start) * 1000
+    assert totals.keys() == expected.keys()
+    return {
+        "list_of_dicts": {"bytes_per_row": dict_bytes / n, "totals_ms": dict_ms},
+        "columnar": {"bytes_per_row": store_bytes / n, "totals_ms": store_ms},
+    }
+
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    results = run(n_rows)
+    for name, r in results.items():
+        # Bytes per row is also MB per million rows.
+        print(f"{name:>13}: {r['bytes_per_row']:7.1f} B/row ({r['bytes_per_row']:7.1f} MB per 1M rows), "
+              f"month/category totals {r['totals_ms']:8.1f} ms")
+    print(f"memory ratio: {results['list_of_dicts']['bytes_per_row'] / results['columnar']['bytes_per_row']:.1f}x")
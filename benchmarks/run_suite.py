@@ -0,0 +1,156 @@
+"""
+The regression suite: SpentML's main operations and chart rendering on synthetic data sets
+of 1k, 100k and 1M transactions, with the results written as JSON.
+
+Run from the repository root (headless, no Kivy window is opened):
+    python -m benchmarks.run_suite [--sizes 1000 100000 1000000] [--output results.json]
+                                   [--baseline previous.json]
+
+For every size a data set is generated (benchmarks/synthetic.py, fixed seed) and saved to a
+temporary directory, so the real data files are never touched. Then:
+
+  init_cold_s         SpentML() loading the data and fitting the model (no saved model)
+  init_warm_s         SpentML() loading the data and the model artifact the cold start saved
+  add_transaction_ms  one add_transaction (categorize, aggregate, journal), mean of ADD_CALLS
+  correct_category_ms one correct_category (re-categorize every matching row, learn the label),
+                      mean over CORRECT_CALLS distinct descriptions
+  compare_months_ms   one compare_months, mean over every pair of adjacent months (uncached)
+  save_data_s         one save_data (snapshot + model artifact)
+  chart_<kind>_ms     ChartUtils.render_chart of the busiest month to raw RGBA, mean of
+                      CHART_REPEATS renders of the pooled figure
+
+With --baseline, the ratio of every timing to the one in an earlier results file is printed
+to stderr (> 1 means slower now), so runs on two commits can be compared directly.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from Backend.SpentML import SpentML
+from Backend.StatementImporter import chunked
+from benchmarks.synthetic import DESCRIPTIONS, fresh_engine, make_rows
+from utils.ChartUtils import figure_to_rgba, render_chart
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+SEED = 0
+# Months covered by the synthetic data, and store-number variants per description.
+N_MONTHS = 60
+VARIANTS = 500
+# Rows per add_transactions_bulk call while building a data set (each call compacts the snapshot).
+BUILD_CHUNK = 100_000
+ADD_CALLS = 200
+CORRECT_CALLS = 10
+CHART_REPEATS = 5
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def mean_ms(func, calls):
+    """Mean milliseconds of func(call) for every call in calls."""
+    calls = list(calls)
+    start = time.perf_counter()
+    for call in calls:
+        func(call)
+    return (time.perf_counter() - start) * 1000 / len(calls)
+
+
+def build_data(n):
+    """Write n synthetic transactions (plus the training samples) to the current directory."""
+    engine = fresh_engine()
+    for chunk in chunked(make_rows(n, SEED, first_year=2020, n_months=N_MONTHS, variants=VARIANTS), BUILD_CHUNK):
+        engine.add_transactions_bulk(chunk)
+    engine.save_data()
+    os.remove(engine.storage.model_file)
+
+
+def run_size(n):
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            build_data(n)
+            results["init_cold_s"], _ = timed(SpentML)
+            results["init_warm_s"], engine = timed(SpentML)
+
+            months = sorted(engine.monthly_spend)
+            new_rows = make_rows(ADD_CALLS, SEED + 1, first_year=2020, n_months=N_MONTHS, variants=VARIANTS)
+            results["add_transaction_ms"] = mean_ms(lambda row: engine.add_transaction(*row), new_rows)
+            corrections = [(f"{desc} #1", "benchmark") for desc in DESCRIPTIONS[:CORRECT_CALLS]]
+            results["correct_category_ms"] = mean_ms(lambda c: engine.correct_category(*c), corrections)
+            results["compare_months_ms"] = mean_ms(lambda pair: engine.compare_months(*pair),
+                                                   zip(months, months[1:]))
+            results["save_data_s"], _ = timed(engine.save_data)
+
+            busiest = max(months, key=lambda ym: len(engine.month_spending(ym)))
+            data = engine.month_spending(busiest)
+            for kind in ("bar", "pie"):
+                render_chart(kind, data, figure_to_rgba)  # warm-up (font cache, pooled figure)
+                results[f"chart_{kind}_ms"] = mean_ms(
+                    lambda i: render_chart(kind, {cat: v + i for cat, v in data.items()}, figure_to_rgba),
+                    range(1, CHART_REPEATS + 1))
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def git_commit():
+    try:
+        proc = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True)
+    except OSError:
+        return None
+    return proc.stdout.strip() if proc.returncode == 0 else None
+
+
+def run(sizes):
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": SEED,
+        "results": {str(n): run_size(n) for n in sizes},
+    }
+
+
+def compare(report, baseline):
+    """Print the ratio of every timing in report to the same timing in baseline."""
+    for size, timings in report["results"].items():
+        old = baseline.get("results", {}).get(size, {})
+        for name, value in timings.items():
+            if old.get(name):
+                print(f"{size:>8} {name:<20} {old[name]:10.4f} -> {value:10.4f}  x{value / old[name]:.2f}",
+                      file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark SpentML and chart rendering on synthetic data.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="transactions per data set")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--baseline", help="earlier JSON results to compare against")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Synthetic spending data shared by the benchmarks: descriptions, the training samples that
+label them, and reproducible (date_ym, desc, amount) rows.
+"""
+import random
+
+from Backend.SpentML import SpentML
+
+DESCRIPTIONS = [
+    "groceries", "supermarket run", "netflix", "coffee at cafe", "rent", "electricity bill",
+    "gaming chair", "bus ticket", "restaurant dinner", "new shoes", "water bill", "gym membership",
+]
+TRAINING_SAMPLES = [
+    ["groceries", "groceries"], ["supermarket run", "groceries"], ["netflix", "entertainment"],
+    ["gaming chair", "entertainment"], ["coffee at cafe", "dining"], ["restaurant dinner", "dining"],
+    ["rent", "housing"], ["electricity bill", "utilities"], ["water bill", "utilities"],
+    ["bus ticket", "transport"], ["new shoes", "clothing"], ["gym membership", "health"],
+]
+
+
+def make_rows(n, seed=0, first_year=2024, n_months=12, variants=0):
+    """
+    n (date_ym, desc, amount) rows spread over n_months months from January of first_year.
+    With variants > 0, most descriptions get one of that many store numbers appended
+    ("bus ticket #17"), so the data also holds descriptions no one has labelled yet.
+    """
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(n):
+        year, month = divmod(rng.randrange(n_months), 12)
+        desc = rng.choice(DESCRIPTIONS)
+        if variants and rng.random() < 0.8:
+            desc = f"{desc} #{rng.randint(1, variants)}"
+        rows.append((f"{first_year + year}-{month + 1:02d}", desc, round(rng.uniform(1, 200), 2)))
+    return rows
+
+
+def fresh_engine():
+    """A SpentML engine (data files in the current directory) that has learned TRAINING_SAMPLES only."""
+    engine = SpentML(username=None)
+    for desc, cat in TRAINING_SAMPLES:
+        engine.partial_fit_sample(desc, cat)
+    return engine
@@ -0,0 +1,180 @@
+"""
+JSONStorage round trips: data written by one SpentML must come back in the next one.
+Every test runs in its own temporary directory, so the real data files are never touched.
+"""
+import json
+import os
+
+import pytest
+
+from Backend.SpentJournal import SpentJournal
+from Backend.SpentML import SpentML
+from Backend.SpentStorage import (LAYOUT_VERSION, ML_DATA_FILE, ML_JOURNAL_FILE, ML_USERS_DIR, JSONStorage,
+                                  SQLiteStorage)
+from utils.AccountManager import invalidate_users_cache
+
+# Amounts are exact in binary, so totals do not depend on the order they were summed in.
+USERS = {
+    "alice": {"onboarding": {"pay_type": "monthly", "monthly_income": "1k",
+                             "bills": [{"description": "rent", "frequency": "monthly", "amount": "500"}]}},
+    "bob": {"onboarding": {"pay_type": "monthly", "monthly_income": "0"}},
+}
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    invalidate_users_cache()
+    yield tmp_path
+    invalidate_users_cache()
+
+
+@pytest.fixture
+def users_file(data_dir):
+    with open("users.json", "w") as f:
+        json.dump(USERS, f)
+
+
+def state(engine):
+    """Everything SpentML loads, as plain data."""
+    user = engine.username
+    return {
+        "training_samples": [list(sample) for sample in engine.training_samples],
+        "monthly_spend": engine.monthly_spend.to_dict(),
+        "user_spending": engine.user_spending[user].to_dict() if user else None,
+        "adjusted_months": sorted(engine.adjusted_months),
+        "transactions": [dict(t) for t in engine.transactions],
+    }
+
+
+def user_transactions(engine, user):
+    return [dict(t) for t in engine.transactions if t.get("user") == user]
+
+
+def journal_lines(path):
+    if not os.path.exists(path):
+        return 0
+    with open(path) as f:
+        return sum(1 for line in f if line.strip())
+
+
+def shard(user):
+    return os.path.join(ML_USERS_DIR, user + ".json"), os.path.join(ML_USERS_DIR, user + ".journal")
+
+
+def test_fresh_install_login_add_restart():
+    engine = SpentML()
+    engine.bind_user("1")
+    engine.add_transaction("2024-03", "groceries", 12.5)
+
+    engine = SpentML(username="1")
+    assert [t["desc"] for t in engine.transactions] == ["groceries"]
+    assert sum(engine.month_spending("2024-03").values()) == 12.5
+
+
+def test_single_file_layout_is_split_into_shards():
+    with open(ML_DATA_FILE, "w") as f:
+        json.dump({
+            "training_samples": [["whole foods", "groceries"]],
+            "monthly_spend": {"2024-01": {"groceries": 10.0, "dining": 5.0}},
+            "user_spending": {"alice": {"2024-01": {"groceries": 10.0, "__adjusted__": True}}},
+            "transactions": [
+                {"date_ym": "2024-01", "desc": "whole foods", "amount": 10.0, "category": "groceries", "user": "alice"},
+                {"date_ym": "2024-01", "desc": "cafe", "amount": 5.0, "category": "dining", "user": None},
+            ],
+            "journal_seq": 1,
+        }, f)
+    SpentJournal(ML_JOURNAL_FILE).append_many([
+        # Already part of the snapshot (seq 1), so it must not be applied again.
+        {"op": "add", "user": None, "date_ym": "2024-01", "desc": "cafe", "amount": 5.0, "category": "dining"},
+        {"op": "add", "user": "bob", "date_ym": "2024-02", "desc": "bus", "amount": 2.5, "category": "transport"},
+    ])
+
+    alice = SpentML(username="alice")
+
+    with open(ML_DATA_FILE) as f:
+        data = json.load(f)
+    assert data["layout"] == LAYOUT_VERSION
+    assert "user_spending" not in data
+    assert [t["user"] for t in data["transactions"]] == [None]
+    assert os.path.exists(shard("alice")[0]) and os.path.exists(shard("bob")[0])
+    assert journal_lines(ML_JOURNAL_FILE) == 0
+
+    assert alice.adjusted_months == {("alice", "2024-01")}
+    assert alice.user_spending["alice"].to_dict() == {"2024-01": {"groceries": 10.0}}
+    assert [t["desc"] for t in alice.transactions] == ["cafe", "whole foods"]
+    assert alice.monthly_spend.to_dict() == {
+        "2024-01": {"groceries": 10.0, "dining": 5.0}, "2024-02": {"transport": 2.5}}
+    assert state(SpentML(username="alice")) == state(alice)
+
+    bob = SpentML(username="bob")
+    assert user_transactions(bob, "bob") == [
+        {"date_ym": "2024-02", "desc": "bus", "amount": 2.5, "category": "transport", "user": "bob"}]
+    assert bob.user_spending["bob"].to_dict() == {"2024-02": {"transport": 2.5}}
+
+
+def test_bind_user_swaps_shards(users_file):
+    engine = SpentML()
+    engine.add_transaction("2024-01", "market", 1.5)
+    engine.bind_user("alice")
+    engine.add_transaction("2024-01", "whole foods", 10.0)
+    engine.bind_user("bob")
+    engine.add_transaction("2024-02", "bus", 2.5)
+
+    assert user_transactions(engine, "alice") == []
+    assert set(engine.user_spending) <= {"bob"}
+    assert all(user == "bob" for user, _ in engine.adjusted_months)
+    assert [t["desc"] for t in engine.transactions] == ["market", "bus"]
+
+    engine.bind_user("alice")
+    assert [t["desc"] for t in engine.transactions] == ["market", "whole foods"]
+    assert engine.adjusted_months == {("alice", "2024-01")}
+    assert engine.user_spending["alice"]["2024-01"]["rent"] == 500.0
+    assert state(SpentML(username="alice")) == state(engine)
+
+    engine.bind_user(None)
+    assert [t["desc"] for t in engine.transactions] == ["market"]
+    assert state(SpentML()) == state(engine)
+
+
+def test_journals_are_compacted_every_compact_every_records(users_file):
+    engine = SpentML(username="alice", storage=JSONStorage(compact_every=3))
+    for i in range(7):
+        engine.add_transaction(f"2024-{i % 3 + 1:02d}", f"shop {i}", 1.5 + i)
+    engine.correct_category("shop 1", "clothing")
+
+    shard_file, shard_journal = shard("alice")
+    assert os.path.exists(shard_file)
+    assert journal_lines(shard_journal) < 3
+    assert journal_lines(ML_JOURNAL_FILE) < 3
+    with open(shard_file) as f:
+        assert json.load(f)["journal_seq"] > 0
+    with open(ML_DATA_FILE) as f:
+        assert json.load(f)["journal_seq"] > 0
+
+    restarted = SpentML(username="alice", storage=JSONStorage(compact_every=3))
+    assert state(restarted) == state(engine)
+    assert [t["category"] for t in restarted.transactions if t["desc"] == "shop 1"] == ["clothing"]
+
+
+def test_sqlite_imports_a_sharded_json_tree(users_file):
+    engine = SpentML(username="alice")
+    engine.add_transaction("2024-01", "whole foods", 10.0)
+    engine.add_transaction("2024-02", "whole foods", 6.5)
+    engine.correct_category("whole foods", "groceries")
+    engine.save_data()
+    engine.add_transaction("2024-02", "cafe", 4.25)   # left in the shard journal
+    engine.bind_user(None)
+    engine.add_transaction("2024-01", "market", 1.5)
+    engine.bind_user("bob")
+    engine.add_transaction("2024-03", "bus", 2.5)     # bob only has a shard journal
+
+    expected = {user: state(SpentML(username=user)) for user in (None, "alice", "bob")}
+
+    for user in (None, "alice", "bob"):
+        imported = SpentML(username=user, storage=SQLiteStorage())
+        got, want = state(imported), expected[user]
+        # SQLite only loads the user's own rows; JSON also keeps the anonymous ones in memory.
+        want["transactions"] = [t for t in want["transactions"] if t["user"] == user]
+        assert got == want, user
+        assert state(SpentML(username=user, storage=SQLiteStorage())) == got
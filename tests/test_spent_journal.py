@@ -0,0 +1,91 @@
+"""SpentJournal: appending, replaying after a snapshot's seq, and surviving damaged lines."""
+import json
+
+import pytest
+
+from Backend.SpentJournal import SpentJournal
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return SpentJournal(str(tmp_path / "spent_ml_data.journal"))
+
+
+def descs(journal, after_seq=0):
+    return [record["desc"] for record in SpentJournal(journal.path).replay(after_seq)]
+
+
+def write_lines(journal, *lines):
+    with open(journal.path, "a") as f:
+        f.write("".join(lines))
+
+
+def test_replay_returns_records_in_order_with_seq(journal):
+    journal.append({"op": "add", "desc": "a"})
+    journal.append_many([{"op": "add", "desc": "b"}, {"op": "add", "desc": "c"}])
+
+    replayed = SpentJournal(journal.path)
+    records = list(replayed.replay())
+    assert [r["desc"] for r in records] == ["a", "b", "c"]
+    assert [r["seq"] for r in records] == [1, 2, 3]
+    assert replayed.seq == 3
+    assert replayed.pending == 3
+
+
+def test_replay_skips_records_already_in_the_snapshot(journal):
+    journal.append_many([{"op": "add", "desc": d} for d in "abcd"])
+
+    replayed = SpentJournal(journal.path)
+    assert [r["desc"] for r in replayed.replay(after_seq=2)] == ["c", "d"]
+    assert replayed.seq == 4
+    assert replayed.pending == 2
+
+
+def test_missing_file_replays_nothing(journal):
+    replayed = SpentJournal(journal.path)
+    assert list(replayed.replay(after_seq=7)) == []
+    assert replayed.seq == 7
+
+
+def test_torn_last_line_is_cut_off_and_later_appends_survive(journal):
+    journal.append_many([{"op": "add", "desc": "a"}, {"op": "add", "desc": "b"}])
+    write_lines(journal, '{"op": "add", "de')
+
+    restarted = SpentJournal(journal.path)
+    assert [r["desc"] for r in restarted.replay()] == ["a", "b"]
+    restarted.append_many([{"op": "add", "desc": "c"}, {"op": "add", "desc": "d"}])
+
+    assert descs(journal) == ["a", "b", "c", "d"]
+
+
+def test_last_record_without_newline_is_kept_and_terminated(journal):
+    write_lines(journal, json.dumps({"op": "add", "desc": "a", "seq": 1}))
+
+    restarted = SpentJournal(journal.path)
+    assert [r["desc"] for r in restarted.replay()] == ["a"]
+    restarted.append({"op": "add", "desc": "b"})
+
+    assert descs(journal) == ["a", "b"]
+
+
+def test_bad_line_in_the_middle_is_skipped_without_losing_later_records(journal):
+    write_lines(
+        journal,
+        json.dumps({"op": "add", "desc": "a", "seq": 1}) + "\n",
+        "not json\n",
+        json.dumps({"op": "add", "desc": "c", "seq": 3}) + "\n",
+    )
+
+    assert descs(journal) == ["a", "c"]
+    # Replaying did not rewrite the file: the third record is still there next time.
+    assert descs(journal) == ["a", "c"]
+    with open(journal.path) as f:
+        assert len(f.readlines()) == 3
+
+
+def test_truncate_empties_the_journal(journal):
+    journal.append({"op": "add", "desc": "a"})
+    journal.truncate()
+
+    assert journal.pending == 0
+    assert descs(journal) == []
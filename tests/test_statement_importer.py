@@ -0,0 +1,93 @@
+"""Statement readers: column-wide day/month detection, amount conventions and bad headers."""
+import pytest
+
+from Backend.StatementImporter import date_order, read_csv_rows, read_qif_rows, resolve_dates
+
+
+def csv_lines(*rows, header="Date,Description,Amount"):
+    return [header + "\n"] + [row + "\n" for row in rows]
+
+
+def qif_lines(*records):
+    lines = ["!Type:Bank\n"]
+    for date, payee, amount in records:
+        lines += [f"D{date}\n", f"T{amount}\n", f"P{payee}\n", "^\n"]
+    return lines
+
+
+@pytest.mark.parametrize("date_str, expected", [
+    ("25/03/2025", True),
+    ("03/25/2025", False),
+    ("03/05/2025", None),
+    ("25.03.2025", True),
+    ("2025-03-25", None),
+    ("25 Mar 2025", None),
+])
+def test_date_order(date_str, expected):
+    assert date_order(date_str) is expected
+
+
+def test_us_csv_is_settled_month_first_by_a_later_date():
+    rows = read_csv_rows(csv_lines("03/05/2025,Coffee,-3.50", "04/25/2025,Rent,-500"))
+    assert list(rows) == [("2025-03", "Coffee", 3.5), ("2025-04", "Rent", 500.0)]
+
+
+def test_european_csv_is_settled_day_first_by_a_later_date():
+    rows = read_csv_rows(csv_lines("03/05/2025,Coffee,-3.50", "25/04/2025,Rent,-500"))
+    assert list(rows) == [("2025-05", "Coffee", 3.5), ("2025-04", "Rent", 500.0)]
+
+
+def test_csv_without_a_deciding_date_falls_back_to_day_first():
+    rows = read_csv_rows(csv_lines("03/05/2025,Coffee,-3.50", "04/06/2025,Rent,-500"))
+    assert [row[0] for row in rows] == ["2025-05", "2025-06"]
+
+
+def test_qif_without_a_deciding_date_falls_back_to_month_first():
+    rows = read_qif_rows(qif_lines(("03/05/2025", "Coffee", "-3.50"), ("04/06/2025", "Rent", "-500")))
+    assert list(rows) == [("2025-03", "Coffee", 3.5), ("2025-04", "Rent", 500.0)]
+
+
+def test_qif_is_settled_day_first_by_a_later_date():
+    rows = read_qif_rows(qif_lines(("03/05/2025", "Coffee", "-3.50"), ("25/04/2025", "Rent", "-500")))
+    assert [row[0] for row in rows] == ["2025-05", "2025-04"]
+
+
+def test_explicit_day_first_overrides_detection():
+    lines = csv_lines("03/05/2025,Coffee,-3.50", "25/04/2025,Rent,-500")
+    rows = read_csv_rows(lines, day_first=False)
+    # 25/04 cannot be month first, so only the first row survives.
+    assert list(rows) == [("2025-03", "Coffee", 3.5)]
+
+
+def test_resolve_dates_keeps_every_row_when_deciding_late():
+    raw = [("01/02/2025", "a", 1.0)] * 5 + [("01/13/2025", "b", 2.0)]
+    assert [row[0] for row in resolve_dates(raw)] == ["2025-01"] * 6
+
+
+def test_debit_and_credit_columns():
+    lines = csv_lines(
+        "2025-03-01,Groceries,12.50,",
+        "2025-03-02,Salary,,1000",
+        "2025-03-03,Refund,-2.00,",
+        header="Date,Description,Debit,Credit",
+    )
+    assert list(read_csv_rows(lines)) == [
+        ("2025-03", "Groceries", 12.5),
+        ("2025-03", "Salary", -1000.0),
+        ("2025-03", "Refund", 2.0),
+    ]
+
+
+def test_positive_spending_exports():
+    lines = csv_lines("2025-03-01,Groceries,12.50")
+    assert list(read_csv_rows(lines, expenses_negative=False)) == [("2025-03", "Groceries", 12.5)]
+
+
+def test_unrecognised_csv_header_raises():
+    with pytest.raises(ValueError, match="Unrecognised CSV header"):
+        read_csv_rows(csv_lines("2025-03-01,x,1", header="When,What,How much"))
+
+
+def test_unparseable_rows_are_skipped():
+    lines = csv_lines("not a date,Coffee,-3.50", "2025-03-01,,-1", "2025-03-02,Tea,abc", "2025-03-03,Cake,-4")
+    assert list(read_csv_rows(lines)) == [("2025-03", "Cake", 4.0)]
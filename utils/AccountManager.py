@@ -4,15 +4,45 @@ import hashlib
 
 USERS_FILE = 'users.json'
 
+# In-memory copy of users.json, shared by every caller of load_users().
+# It is reused as long as the file's (mtime, inode, size) is unchanged.
+_users_cache = None
+_users_cache_key = None
+
+def _users_file_key():
+    try:
+        st = os.stat(USERS_FILE)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_ino, st.st_size)
+
 def load_users():
-    if not os.path.exists(USERS_FILE):
+    """
+    Return the users dict, re-reading users.json only when it changed on disk.
+    The dict is shared: callers that modify it must call save_users() afterwards.
+    """
+    global _users_cache, _users_cache_key
+    key = _users_file_key()
+    if key is None:
         return {}
-    with open(USERS_FILE, 'r') as f:
-        return json.load(f)
+    if _users_cache is None or key != _users_cache_key:
+        with open(USERS_FILE, 'r') as f:
+            _users_cache = json.load(f)
+        _users_cache_key = key
+    return _users_cache
 
 def save_users(users):
+    global _users_cache, _users_cache_key
     with open(USERS_FILE, 'w') as f:
         json.dump(users, f)
+    _users_cache = users
+    _users_cache_key = _users_file_key()
+
+def invalidate_users_cache():
+    """Force the next load_users() to re-read users.json."""
+    global _users_cache, _users_cache_key
+    _users_cache = None
+    _users_cache_key = None
 
 def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
@@ -1,53 +1,335 @@
 import io
-import matplotlib.pyplot as plt
-from kivy.core.image import Image as CoreImage
+import math
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
+# Figures are built without pyplot (no global figure manager), so they can be drawn
+# from the background render thread.
+from matplotlib.artist import setp
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+# Default figure size (inches) and resolution for every chart.
+CHART_FIGSIZE = (9, 7)
+CHART_DPI = 100
+# Maximum number of rendered chart textures kept in memory.
+CHART_CACHE_SIZE = 16
+# How a figure becomes a texture:
+#   "rgba" - draw with the Agg canvas and blit its raw RGBA buffer straight into a Texture.
+#   "png"  - encode the figure as PNG and let Kivy decode it again (the original path).
+CHART_RENDER_MODE = "rgba"
+
+# (chart type, category items, figsize, dpi, mode) -> texture, least recently used first.
+_texture_cache = OrderedDict()
+
+
+def _cache_key(kind, categories_dict, figsize, dpi):
+    # The items tuple keeps the category order, which is also the bar/wedge order.
+    return (kind, tuple(categories_dict.items()), tuple(figsize), dpi, CHART_RENDER_MODE)
+
+
+def _cached_texture(key, render):
+    texture = _cache_get(key)
+    if texture is None:
+        texture = render()
+        _cache_put(key, texture)
+    return texture
 
-def create_category_bar(categories_dict):
-    """
-    Creates a bar chart from the categories_dict (e.g. {"Groceries": 100, "Dining": 50, ...})
-    and returns a Kivy texture that can be displayed using an Image widget.
-    """
-    # Increase the figure size for better visibility.
-    fig, ax = plt.subplots(figsize=(9, 7), dpi=100)
 
-    labels = list(categories_dict.keys())
-    values = list(categories_dict.values())
+def _cache_get(key):
+    texture = _texture_cache.get(key)
+    if texture is not None:
+        _texture_cache.move_to_end(key)
+    return texture
 
-    ax.bar(labels, values, color='blue')
-    ax.set_ylabel("Amount")
-    ax.set_title("Spending by Category")
-    plt.setp(ax.get_xticklabels(), rotation=30, ha='right')
 
+def _cache_put(key, texture):
+    _texture_cache[key] = texture
+    if len(_texture_cache) > CHART_CACHE_SIZE:
+        _texture_cache.popitem(last=False)
+
+
+def clear_chart_cache():
+    _texture_cache.clear()
+
+
+# -------------------------
+# Figure -> pixels (no Kivy needed)
+# -------------------------
+def figure_to_png(fig):
+    """Encode the figure as PNG bytes (cropped to its content)."""
     buf = io.BytesIO()
     fig.savefig(buf, format='png', bbox_inches='tight')
     buf.seek(0)
-    plt.close(fig)
-    core_image = CoreImage(buf, ext='png')
+    return buf
+
+
+def figure_to_rgba(fig):
+    """
+    Draw the figure on its Agg canvas and return (width, height, rgba), where rgba is the
+    canvas' own memoryview (no copy, no compression), valid until the figure is redrawn.
+    """
+    canvas = fig.canvas
+    canvas.draw()
+    width, height = canvas.get_width_height()
+    return width, height, canvas.buffer_rgba()
+
+
+def figure_to_pixels(fig):
+    """Like figure_to_rgba, but with the pixels copied out so the figure can be reused."""
+    width, height, rgba = figure_to_rgba(fig)
+    return width, height, bytes(rgba)
+
+
+# -------------------------
+# Pixels -> Kivy texture
+# -------------------------
+def rgba_to_texture(width, height, rgba):
+    from kivy.graphics.texture import Texture
+
+    texture = Texture.create(size=(width, height), colorfmt='rgba')
+    texture.blit_buffer(rgba, colorfmt='rgba', bufferfmt='ubyte')
+    # Agg rows start at the top, GL textures at the bottom.
+    texture.flip_vertical()
+    return texture
+
+
+def figure_to_texture(fig):
+    if CHART_RENDER_MODE == "rgba":
+        return rgba_to_texture(*figure_to_rgba(fig))
+
+    from kivy.core.image import Image as CoreImage
+
+    core_image = CoreImage(figure_to_png(fig), ext='png')
     return core_image.texture
 
 
-def create_category_pie(categories_dict):
+# -------------------------
+# Charts
+# -------------------------
+class ChartFigure:
+    """
+    A persistent, pyplot-free figure for one chart type ('bar' or 'pie').
+
+    draw() clears and rebuilds the axes only when the set of categories changes; when the
+    same categories are drawn again just the bar heights or wedge angles (and their labels)
+    are updated in place. Hold `lock` while drawing and reading the pixels.
+    """
+
+    def __init__(self, kind, figsize=CHART_FIGSIZE, dpi=CHART_DPI):
+        self.kind = kind
+        self.fig = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.subplots()
+        self.lock = threading.Lock()
+        self.labels = None      # categories currently drawn (None = must rebuild)
+        self.artists = []       # bar rectangles or pie wedges
+        self.texts = []         # pie label texts
+        self.autotexts = []     # pie percentage texts
+
+    def draw(self, categories_dict):
+        labels = list(categories_dict.keys())
+        values = list(categories_dict.values())
+        if self.kind == 'bar':
+            self._draw_bar(labels, values)
+        else:
+            self._draw_pie(labels, values)
+        return self.fig
+
+    def _draw_bar(self, labels, values):
+        ax = self.ax
+        if labels == self.labels:
+            for rect, value in zip(self.artists, values):
+                rect.set_height(value)
+            ax.relim()
+            ax.autoscale_view()
+        else:
+            ax.clear()
+            bars = ax.bar(labels, values, color='blue')
+            ax.set_ylabel("Amount")
+            ax.set_title("Spending by Category")
+            setp(ax.get_xticklabels(), rotation=30, ha='right')
+            self.labels = labels
+            self.artists = list(bars.patches)
+        # Tick labels change width with the values, so the layout is redone every time.
+        self.fig.tight_layout()
+
+    def _draw_pie(self, labels, values):
+        ax = self.ax
+        total = sum(values)
+
+        if total == 0:
+            ax.clear()
+            ax.text(0.5, 0.5, "No data", ha='center', va='center', fontsize=12)
+            self.labels = None
+        elif labels == self.labels:
+            self._update_wedges(values, total)
+        else:
+            ax.clear()
+            wedges, texts, autotexts = ax.pie(values, labels=labels, autopct='%1.1f%%')
+            self.labels = labels
+            self.artists, self.texts, self.autotexts = wedges, texts, autotexts
+            self.fig.tight_layout()
+
+        ax.set_title("Spending Distribution\nTotal Spent: ${:.2f}".format(total))
+
+    def _update_wedges(self, values, total):
+        # Same geometry as Axes.pie with its defaults (start angle 0, counter-clockwise,
+        # radius 1, labels at 1.1, percentages at 0.6).
+        theta1 = 0.0
+        for wedge, text, autotext, value in zip(self.artists, self.texts, self.autotexts, values):
+            frac = value / total
+            theta2 = theta1 + frac
+            thetam = math.pi * (theta1 + theta2)
+            wedge.set_theta1(360.0 * theta1)
+            wedge.set_theta2(360.0 * theta2)
+            xt, yt = 1.1 * math.cos(thetam), 1.1 * math.sin(thetam)
+            text.set_position((xt, yt))
+            text.set_horizontalalignment('left' if xt > 0 else 'right')
+            autotext.set_position((0.6 * math.cos(thetam), 0.6 * math.sin(thetam)))
+            autotext.set_text('%1.1f%%' % (100.0 * frac))
+            theta1 = theta2
+
+
+# (chart type, figsize, dpi) -> ChartFigure, reused for every render of that chart.
+_figure_pool = {}
+_figure_pool_lock = threading.Lock()
+
+
+def _pooled_figure(kind, figsize, dpi):
+    key = (kind, tuple(figsize), dpi)
+    with _figure_pool_lock:
+        chart = _figure_pool.get(key)
+        if chart is None:
+            chart = _figure_pool[key] = ChartFigure(kind, figsize, dpi)
+        return chart
+
+
+def render_chart(kind, categories_dict, convert, figsize=CHART_FIGSIZE, dpi=CHART_DPI):
+    """
+    Draw a 'bar' or 'pie' chart on its pooled figure and return convert(fig), e.g.
+    figure_to_texture or figure_to_pixels. The figure is locked while convert runs.
+    """
+    chart = _pooled_figure(kind, figsize, dpi)
+    with chart.lock:
+        return convert(chart.draw(categories_dict))
+
+
+def create_category_bar(categories_dict, figsize=CHART_FIGSIZE, dpi=CHART_DPI):
+    """
+    Creates a bar chart from the categories_dict (e.g. {"Groceries": 100, "Dining": 50, ...})
+    and returns a Kivy texture that can be displayed using an Image widget.
+    Textures are cached, so showing the same month's data again does not re-render it.
+    """
+    key = _cache_key('bar', categories_dict, figsize, dpi)
+    return _cached_texture(key, lambda: render_chart('bar', categories_dict, figure_to_texture, figsize, dpi))
+
+
+def create_category_pie(categories_dict, figsize=CHART_FIGSIZE, dpi=CHART_DPI):
     """
     Creates a pie chart from categories_dict and returns a Kivy texture.
     Displays the category percentages along with a title.
+    Textures are cached like the bar chart's.
+    """
+    key = _cache_key('pie', categories_dict, figsize, dpi)
+    return _cached_texture(key, lambda: render_chart('pie', categories_dict, figure_to_texture, figsize, dpi))
+
+
+# -------------------------
+# Background rendering
+# -------------------------
+class ChartRenderWorker:
     """
-    fig, ax = plt.subplots(figsize=(9, 7), dpi=100)
+    Renders charts on a background thread so matplotlib never blocks the Kivy event loop.
 
-    labels = list(categories_dict.keys())
-    values = list(categories_dict.values())
-    total = sum(values)
+    request() hands the figure drawing to a single worker thread, which returns a copy of
+    the raw RGBA pixels; the texture upload (which needs the GL context) is then scheduled
+    on the UI thread with Clock.schedule_once and the callback receives the texture.
+    Only the latest request counts: a newer request cancels one that has not started and
+    drops the result of one that is still rendering.
+    """
 
-    if total == 0:
-        ax.text(0.5, 0.5, "No data", ha='center', va='center', fontsize=12)
-    else:
-        ax.pie(values, labels=labels, autopct='%1.1f%%')
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chart-render")
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._future = None
 
-    ax.set_title("Spending Distribution\nTotal Spent: ${:.2f}".format(total))
+    def request(self, kind, categories_dict, callback, figsize=CHART_FIGSIZE, dpi=CHART_DPI):
+        key = _cache_key(kind, categories_dict, figsize, dpi)
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            if self._future is not None:
+                self._future.cancel()
+                self._future = None
+        texture = _cache_get(key)
+        if texture is not None:
+            callback(texture)
+            return
+        data = dict(categories_dict)
+        future = self._executor.submit(self._render, generation, kind, data, figsize, dpi)
+        future.add_done_callback(lambda f: self._on_rendered(f, generation, key, callback))
+        with self._lock:
+            if generation == self._generation:
+                self._future = future
 
-    buf = io.BytesIO()
-    fig.savefig(buf, format='png', bbox_inches='tight')
-    buf.seek(0)
-    plt.close(fig)
-    core_image = CoreImage(buf, ext='png')
-    return core_image.texture
+    def cancel(self):
+        """Forget any pending request (e.g. when the screen is reset)."""
+        with self._lock:
+            self._generation += 1
+            if self._future is not None:
+                self._future.cancel()
+                self._future = None
+
+    def _is_current(self, generation):
+        with self._lock:
+            return generation == self._generation
+
+    def _render(self, generation, kind, data, figsize, dpi):
+        # Runs on the worker thread.
+        if not self._is_current(generation):
+            return None
+        return render_chart(kind, data, figure_to_pixels, figsize, dpi)
+
+    def _on_rendered(self, future, generation, key, callback):
+        # Runs on the worker thread (or inline if the future was cancelled).
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            from kivy.logger import Logger
+
+            Logger.error("ChartUtils: %s chart render failed", key[0], exc_info=error)
+            return
+        pixels = future.result()
+        if pixels is None:
+            return
+        from kivy.clock import Clock
+
+        Clock.schedule_once(lambda dt: self._deliver(generation, key, pixels, callback), 0)
+
+    def _deliver(self, generation, key, pixels, callback):
+        # Runs on the UI thread.
+        if not self._is_current(generation):
+            return
+        texture = rgba_to_texture(*pixels)
+        _cache_put(key, texture)
+        callback(texture)
+
+
+_render_worker = None
+
+
+def render_chart_async(kind, categories_dict, callback):
+    """Render a 'bar' or 'pie' chart off the UI thread and pass the texture to callback."""
+    global _render_worker
+    if _render_worker is None:
+        _render_worker = ChartRenderWorker()
+    _render_worker.request(kind, categories_dict, callback)
+
+
+def cancel_chart_render():
+    if _render_worker is not None:
+        _render_worker.cancel()